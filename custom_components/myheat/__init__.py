@@ -5,19 +5,26 @@ For more details about this integration, please refer to
 https://github.com/vooon/hass-myheat
 """
 
+import asyncio
+import hashlib
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 
+from .account import async_get_account, async_release_account
 from .api import MhApiClient
 from .const import (
     CONF_API_KEY,
+    CONF_CLOUD_SUMMARY_POLLING,
     CONF_DEVICE_ID,
+    CONF_LOCAL_FETCH_MODE,
     CONF_LOCAL_HOST,
     CONF_LOCAL_MODE_ENABLED,
     CONF_LOCAL_PASSWORD,
@@ -27,12 +34,18 @@ from .const import (
     CONF_LOCAL_USERNAME,
     CONF_NAME,
     CONF_USERNAME,
+    DEFAULT_CLOUD_FULL_POLL_INTERVAL,
     DEFAULT_CLOUD_POLL_INTERVAL,
+    DEFAULT_CLOUD_SUMMARY_POLLING,
+    DEFAULT_LOCAL_FETCH_MODE,
     DEFAULT_LOCAL_POLL_INTERVAL,
     DEFAULT_LOCAL_PROTOCOL,
     DEFAULT_LOCAL_REQUEST_TIMEOUT,
     DEFAULT_NAME,
     DOMAIN,
+    LOCAL_SESSION_SAVE_DELAY,
+    LOCAL_SESSION_STORAGE_KEY,
+    LOCAL_SESSION_STORAGE_VERSION,
     MANUFACTURER,
     PLATFORMS,
     STARTUP_MESSAGE,
@@ -41,6 +54,8 @@ from .const import (
 from .coordinator import MhConfigEntry, MhDataUpdateCoordinator
 from .hybrid_api import MhHybridApiClient
 from .local_api import LocalApiClient
+from .local_queue import async_get_local_queue
+from .scheduler import async_get_scheduler
 from .services import async_setup_services
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
@@ -70,6 +85,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: MhConfigEntry):
         api_key=api_key,
         device_id=device_id,
         session=session,
+        account=async_get_account(hass, username, api_key, entry.entry_id),
     )
 
     local_config = {**entry.data, **entry.options}
@@ -83,6 +99,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: MhConfigEntry):
         local_username = local_config.get(CONF_LOCAL_USERNAME)
         local_password = local_config.get(CONF_LOCAL_PASSWORD)
         if local_host and local_username and local_password:
+            session_store = _local_session_store(hass, entry)
+            stored = await session_store.async_load() or {}
+            # a session is only reused by the login that opened it
+            owner = {
+                "host": local_host,
+                "username": local_username,
+                "password_digest": hashlib.sha256(local_password.encode()).hexdigest(),
+            }
+
+            @callback
+            def save_session(session_id: str) -> None:
+                session_store.async_delay_save(
+                    lambda: {**owner, "session_id": session_id},
+                    LOCAL_SESSION_SAVE_DELAY,
+                )
+
             local_client = LocalApiClient(
                 host=local_host,
                 protocol=local_config.get(CONF_LOCAL_PROTOCOL, DEFAULT_LOCAL_PROTOCOL),
@@ -95,6 +127,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: MhConfigEntry):
                     )
                 ),
                 session=session,
+                session_id=(
+                    stored.get("session_id")
+                    if all(stored.get(key) == value for key, value in owner.items())
+                    else None
+                ),
+                session_callback=save_session,
+                queue=async_get_local_queue(hass, local_host),
             )
         else:
             _LOGGER.warning("Local MY HEAT API is enabled but not fully configured")
@@ -104,6 +143,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: MhConfigEntry):
         local_client=local_client,
         cloud_poll_interval=DEFAULT_CLOUD_POLL_INTERVAL,
         local_poll_interval=local_poll_interval,
+        local_fetch_mode=local_config.get(
+            CONF_LOCAL_FETCH_MODE, DEFAULT_LOCAL_FETCH_MODE
+        ),
+        cloud_full_poll_interval=(
+            DEFAULT_CLOUD_FULL_POLL_INTERVAL
+            if local_config.get(
+                CONF_CLOUD_SUMMARY_POLLING, DEFAULT_CLOUD_SUMMARY_POLLING
+            )
+            else None
+        ),
     )
 
     scan_seconds = (
@@ -111,15 +160,70 @@ async def async_setup_entry(hass: HomeAssistant, entry: MhConfigEntry):
         if local_client is not None
         else DEFAULT_CLOUD_POLL_INTERVAL
     )
+    scheduler = async_get_scheduler(hass)
+    scheduler.add(entry.entry_id)
     coordinator = MhDataUpdateCoordinator(
         hass,
         client=client,
         entry=entry,
         scan_interval=timedelta(seconds=scan_seconds),
+        scheduler=scheduler,
     )
-    await coordinator.async_config_entry_first_refresh()
     entry.runtime_data = coordinator
 
+    if delay := scheduler.first_refresh_delay(entry.entry_id):
+        # entries set up together do not hit the APIs at the same moment
+        @callback
+        def _async_first_refresh(_now: datetime) -> None:
+            entry.async_create_background_task(
+                hass,
+                _async_setup_platforms_later(hass, entry),
+                f"{DOMAIN} first refresh {entry.title}",
+            )
+
+        entry.async_on_unload(async_call_later(hass, delay, _async_first_refresh))
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            # the entry may be removed while it waits for a setup retry
+            _async_release_entry(hass, entry)
+            raise
+
+        _async_register_device(hass, entry)
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        coordinator.platforms_loaded = True
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    return True
+
+
+async def _async_setup_platforms_later(
+    hass: HomeAssistant, entry: MhConfigEntry
+) -> None:
+    """Run the staggered first refresh, then set up the platforms.
+
+    Until a refresh succeeds, the coordinator keeps polling on its interval.
+    """
+    coordinator = entry.runtime_data
+    await coordinator.async_refresh()
+    if not coordinator.last_update_success:
+        refreshed = asyncio.Event()
+        remove_listener = coordinator.async_add_listener(refreshed.set)
+        try:
+            while not coordinator.last_update_success:
+                refreshed.clear()
+                await refreshed.wait()
+        finally:
+            remove_listener()
+
+    _async_register_device(hass, entry)
+    await hass.config_entries.async_late_forward_entry_setups(entry, PLATFORMS)
+    coordinator.platforms_loaded = True
+
+
+@callback
+def _async_register_device(hass: HomeAssistant, entry: MhConfigEntry) -> None:
     device_registry = dr.async_get(hass)
     device_registry.async_get_or_create(
         config_entry_id=entry.entry_id,
@@ -129,17 +233,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: MhConfigEntry):
         name=entry.data.get(CONF_NAME, DEFAULT_NAME),
     )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.add_update_listener(async_reload_entry)
-    return True
-
 
 async def async_unload_entry(hass: HomeAssistant, entry: MhConfigEntry) -> bool:
     """Handle removal of an entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unloaded = True
+    if entry.runtime_data.platforms_loaded:
+        unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unloaded:
+        _async_release_entry(hass, entry)
+    return unloaded
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: MhConfigEntry) -> None:
+    """Remove data stored for a deleted entry."""
+    _async_release_entry(hass, entry)
+    await _local_session_store(hass, entry).async_remove()
+
+
+@callback
+def _async_release_entry(hass: HomeAssistant, entry: MhConfigEntry) -> None:
+    """Release the poll slot and account reference of the entry."""
+    async_get_scheduler(hass).remove(entry.entry_id)
+    async_release_account(
+        hass,
+        entry.data.get(CONF_USERNAME),
+        entry.data.get(CONF_API_KEY),
+        entry.entry_id,
+    )
+
+
+def _local_session_store(hass: HomeAssistant, entry: MhConfigEntry) -> Store[dict]:
+    return Store(
+        hass,
+        LOCAL_SESSION_STORAGE_VERSION,
+        f"{LOCAL_SESSION_STORAGE_KEY}.{entry.entry_id}",
+    )
 
 
 async def async_reload_entry(hass: HomeAssistant, entry: MhConfigEntry) -> None:
     """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,75 @@
+"""MyHeat cloud account state shared by config entries."""
+
+import asyncio
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .breaker import MhCircuitBreaker
+from .const import (
+    DEFAULT_CLOUD_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_CLOUD_POLL_INTERVAL,
+    DOMAIN,
+)
+from .ratelimit import MhRateLimiter
+
+DATA_ACCOUNTS = "accounts"
+
+
+class MhAccount:
+    """Request scheduling and caches shared by all clients of one account.
+
+    Every MhApiClient of the account sends its requests through the same
+    rate limit, concurrency limit and circuit breaker, shares in-flight reads
+    and parsed responses, and reuses one getDevices result for `devices_ttl`
+    seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent_requests: int = DEFAULT_CLOUD_MAX_CONCURRENT_REQUESTS,
+        devices_ttl: float = DEFAULT_CLOUD_POLL_INTERVAL,
+    ) -> None:
+        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self.breaker = MhCircuitBreaker()
+        self.limiter = MhRateLimiter()
+        self.devices_ttl = devices_ttl
+        self.devices: dict[str, Any] | None = None
+        self.devices_updated_at = 0.0
+        self.responses: dict[tuple[str, Any], tuple[bytes, dict]] = {}
+        self.inflight: dict[tuple, asyncio.Future] = {}
+        self.entries: set[str] = set()
+
+
+@callback
+def async_get_account(
+    hass: HomeAssistant,
+    username: str,
+    api_key: str,
+    entry_id: str,
+) -> MhAccount:
+    """Return the shared account for the credentials and register the entry."""
+
+    accounts = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_ACCOUNTS, {})
+    if (account := accounts.get((username, api_key))) is None:
+        account = accounts[(username, api_key)] = MhAccount()
+    account.entries.add(entry_id)
+    return account
+
+
+@callback
+def async_release_account(
+    hass: HomeAssistant,
+    username: str,
+    api_key: str,
+    entry_id: str,
+) -> None:
+    """Unregister the entry and drop the account when no entry uses it."""
+
+    accounts = hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {})
+    if (account := accounts.get((username, api_key))) is None:
+        return
+    account.entries.discard(entry_id)
+    if not account.entries:
+        del accounts[(username, api_key)]
@@ -3,12 +3,18 @@
 import asyncio
 import logging
 import socket
+import time
 from typing import Any, Union
 
 import aiohttp
 import voluptuous as vol
 
+from .account import MhAccount
+from .breaker import MhCircuitBreaker
+from .codec import body_digest, decode_json, encode_json
 from .const import VERSION
+from .ratelimit import MhRateLimiter
+from .validation import compile_validator
 
 TIMEOUT = 10
 
@@ -33,6 +39,18 @@ HEADERS = {
 
 RPC_ENDPOINT = "https://my.myheat.net/api/request/"
 
+# Read-only actions: concurrent identical calls share one request, and the
+# parsed response is reused while the response body is unchanged
+RPC_READ_ACTIONS = {"getDevices", "getDeviceInfo"}
+
+# Errors meaning the server could not be reached or did not answer properly
+RPC_TRANSPORT_ERRORS = (
+    asyncio.TimeoutError,
+    aiohttp.ClientError,
+    socket.gaierror,
+    ValueError,
+)
+
 RPC_SCHEMA = vol.Schema(
     {
         vol.Required("err"): int,
@@ -129,6 +147,7 @@ RPC_SCHEMA = vol.Schema(
     },
     extra=vol.ALLOW_EXTRA,
 )
+RPC_VALIDATOR = compile_validator(RPC_SCHEMA)
 
 
 class RPCError(Exception):
@@ -155,16 +174,49 @@ class MhApiClient:
         api_key: str,
         device_id: int | None,
         session: aiohttp.ClientSession,
+        account: MhAccount | None = None,
     ) -> None:
         """Sample API Client."""
+        if account is None:
+            account = MhAccount(devices_ttl=0)
+
         self._username: str = username
         self._api_key: str = api_key
         self._device_id: int | None = device_id
         self._session: aiohttp.ClientSession = session
+        self._account: MhAccount = account
+
+    @property
+    def breaker(self) -> MhCircuitBreaker:
+        """Circuit breaker shared by the clients of the account."""
+        return self._account.breaker
+
+    @property
+    def limiter(self) -> MhRateLimiter:
+        """Rate limiter shared by the clients of the account."""
+        return self._account.limiter
 
     async def async_get_devices(self) -> dict:
         """Get available devices"""
-        return await self.rpc("getDevices")
+        account = self._account
+        now = time.monotonic()
+        if (
+            account.devices is not None
+            and now - account.devices_updated_at < account.devices_ttl
+        ):
+            return account.devices
+
+        account.devices = await self.rpc("getDevices")
+        account.devices_updated_at = now
+        return account.devices
+
+    async def async_get_device_summary(
+        self, *, device_id: int | None = None
+    ) -> dict | None:
+        """Get the getDevices entry of the device, None if it is not listed"""
+        device_id = device_id or self._device_id
+        devices = (await self.async_get_devices()).get("devices", [])
+        return next((dev for dev in devices if dev.get("id") == device_id), None)
 
     async def async_get_device_info(self, *, device_id: int | None = None) -> dict:
         """Get device state and objects"""
@@ -251,31 +303,100 @@ class MhApiClient:
         """Set security alarm mode (on/off)"""
         await self.rpc("setSecurityMode", deviceId=device_id, mode=mode and 1 or 0)
 
-    async def rpc(self, action: str, **kwargs: dict) -> dict:
+    async def rpc(self, action: str, **kwargs: Any) -> dict:
         """Get information from the API."""
 
+        # If deviceId is passed, and it is None => use the id stored in the instance
+        if kwargs.get("deviceId", 1) is None:
+            kwargs["deviceId"] = self._device_id
+
+        if action not in RPC_READ_ACTIONS:
+            try:
+                return await self._rpc(action, **kwargs)
+            finally:
+                self._forget_reads(kwargs.get("deviceId"))
+
+        inflight = self._account.inflight
+        key = (action, *sorted(kwargs.items()))
+        if (request := inflight.get(key)) is None:
+            request = asyncio.ensure_future(self._rpc(action, **kwargs))
+            inflight[key] = request
+
+            def _forget(_: asyncio.Future) -> None:
+                if inflight.get(key) is request:
+                    del inflight[key]
+
+            request.add_done_callback(_forget)
+
+        # shielded, so a cancelled caller does not cancel the shared request
+        return await asyncio.shield(request)
+
+    def _forget_reads(self, device_id: int | None) -> None:
+        """Stop sharing reads of the device that started before a write.
+
+        They may still return the old state, so later reads send a new request.
+        """
+
+        inflight = self._account.inflight
+        for key in [key for key in inflight if ("deviceId", device_id) in key]:
+            del inflight[key]
+
+    async def _rpc(self, action: str, **kwargs: Any) -> dict:
+        breaker = self._account.breaker
+        probe = breaker.before_request()
+        try:
+            await self._account.limiter.acquire(write=action not in RPC_READ_ACTIONS)
+            async with self._account.semaphore:
+                result = await self._post_rpc(action, **kwargs)
+        except RPC_TRANSPORT_ERRORS:
+            breaker.record_failure(probe=probe)
+            raise
+        except Exception:
+            # the server answered, e.g. with an RPC error
+            breaker.record_success(probe=probe)
+            raise
+        except BaseException:
+            breaker.release(probe=probe)
+            raise
+
+        breaker.record_success(probe=probe)
+        return result
+
+    async def _post_rpc(self, action: str, **kwargs: Any) -> dict:
         url = RPC_ENDPOINT
 
         kwargs["action"] = action
         kwargs["login"] = self._username
         kwargs["key"] = self._api_key
 
-        # If deviceId is passed, and it is None => use the id stored in the instance
-        if kwargs.get("deviceId", 1) is None:
-            kwargs["deviceId"] = self._device_id
-
         try:
             async with asyncio.timeout(TIMEOUT):
-                response = await self._session.post(url, headers=HEADERS, json=kwargs)
-                data = await response.json()
+                response = await self._session.post(
+                    url, headers=HEADERS, data=encode_json(kwargs)
+                )
+                body = await response.read()
+
+                cache_key = (action, kwargs.get("deviceId"))
+                digest = None
+                if action in RPC_READ_ACTIONS:
+                    digest = body_digest(body)
+                    cached = self._account.responses.get(cache_key)
+                    if cached is not None and cached[0] == digest:
+                        _LOGGER.debug("Data unchanged: %s", action)
+                        return cached[1]
+
+                data = decode_json(body)
 
                 _LOGGER.debug("Data: %s", data)
 
-                data = RPC_SCHEMA(data)
+                data = RPC_VALIDATOR(data)
                 if data["err"] != 0:
                     raise RPCError(data)
 
-                return data.get("data", {})
+                result = data.get("data", {})
+                if digest is not None:
+                    self._account.responses[cache_key] = (digest, result)
+                return result
 
         except (asyncio.TimeoutError, asyncio.CancelledError) as ex:
             _LOGGER.exception(
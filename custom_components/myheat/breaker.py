@@ -0,0 +1,118 @@
+"""Circuit breaker for the MyHeat cloud API."""
+
+from datetime import UTC, datetime, timedelta
+import logging
+import random
+import time
+
+from .const import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    DEFAULT_BREAKER_BASE_BACKOFF,
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_BREAKER_MAX_BACKOFF,
+)
+from .listeners import MhListenable
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+
+class CircuitOpenError(Exception):
+    """Request rejected without being sent because the circuit is open."""
+
+    def __init__(self, next_retry: datetime | None) -> None:
+        super().__init__(f"MyHeat cloud API circuit is open until {next_retry}")
+        self.next_retry = next_retry
+
+
+class MhCircuitBreaker(MhListenable):
+    """Stops sending requests to the cloud after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests fail fast. Once the backoff passes, a single probe request is
+    let through (half-open): its success closes the circuit, its failure
+    opens it again with a doubled, jittered backoff. Outcomes of other
+    requests that land while the circuit is not closed were started before
+    it opened and are ignored.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURE_THRESHOLD,
+        base_backoff: float = DEFAULT_BREAKER_BASE_BACKOFF,
+        max_backoff: float = DEFAULT_BREAKER_MAX_BACKOFF,
+    ) -> None:
+        super().__init__()
+        self._failure_threshold = failure_threshold
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._retry_at = 0.0
+        self._probing = False
+        self._trips = 0
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.next_retry: datetime | None = None
+
+    def before_request(self) -> bool:
+        """Raise CircuitOpenError unless a request may be sent now.
+
+        Returns whether the request is the half-open probe, which has to be
+        passed back with its outcome.
+        """
+
+        if self.state == BREAKER_CLOSED:
+            return False
+        if self.state == BREAKER_OPEN and time.monotonic() >= self._retry_at:
+            self._set_state(BREAKER_HALF_OPEN)
+        if self.state == BREAKER_HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        raise CircuitOpenError(self.next_retry)
+
+    def record_success(self, *, probe: bool = False) -> None:
+        """Close the circuit after a request reached the server."""
+
+        if self.state != BREAKER_CLOSED and not probe:
+            return
+        self._probing = False
+        self.failures = 0
+        self._trips = 0
+        self.next_retry = None
+        self._set_state(BREAKER_CLOSED)
+
+    def record_failure(self, *, probe: bool = False) -> None:
+        """Count a failed request and open the circuit when needed."""
+
+        if self.state != BREAKER_CLOSED and not probe:
+            return
+        self._probing = False
+        self.failures += 1
+        if self.state == BREAKER_CLOSED and self.failures < self._failure_threshold:
+            return
+
+        backoff = min(self._max_backoff, self._base_backoff * 2**self._trips)
+        backoff = backoff / 2 + random.uniform(0, backoff / 2)
+        self._trips += 1
+        self._retry_at = time.monotonic() + backoff
+        self.next_retry = datetime.now(UTC) + timedelta(seconds=backoff)
+        if self.state != BREAKER_OPEN:
+            _LOGGER.warning(
+                "MyHeat cloud API failed %d times, pausing requests for %.0f s",
+                self.failures,
+                backoff,
+            )
+        self._set_state(BREAKER_OPEN, force=True)
+
+    def release(self, *, probe: bool = False) -> None:
+        """Give up a request without an outcome (cancelled)."""
+
+        if probe:
+            self._probing = False
+
+    def _set_state(self, state: str, *, force: bool = False) -> None:
+        if state == self.state and not force:
+            return
+        self.state = state
+        self._notify()
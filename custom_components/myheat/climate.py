@@ -143,8 +143,16 @@ class MhEnvClimate(MhEnvEntity, ClimateEntity):
             HVACMode.HEAT if self._attr_target_temperature is not None else HVACMode.OFF
         )
 
+    def _mh_state(self) -> tuple:
+        return (
+            self._attr_current_temperature,
+            self._attr_target_temperature,
+            self._attr_hvac_action,
+            self._attr_hvac_mode,
+        )
+
     @callback
     def _handle_coordinator_update(self):
         """Get the latest state from the thermostat."""
         self._update_state_attrs()
-        self.async_write_ha_state()
+        super()._handle_coordinator_update()
@@ -0,0 +1,45 @@
+"""JSON codec and response body helpers shared by the cloud and local clients.
+
+orjson is used when it is installed (it ships with Home Assistant), the
+standard library otherwise.
+"""
+
+import hashlib
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _json_dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+_loads: Callable[[bytes], Any]
+_dumps: Callable[[Any], bytes]
+if orjson is not None:
+    JSON_CODEC = "orjson"
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+else:  # pragma: no cover
+    JSON_CODEC = "json"
+    _loads = json.loads
+    _dumps = _json_dumps
+
+
+def body_digest(body: bytes) -> bytes:
+    """Return a digest used to detect repeated response bodies."""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def decode_json(body: bytes) -> Any:
+    """Decode a JSON response body, raises ValueError on invalid JSON."""
+    return _loads(body)
+
+
+def encode_json(data: Any) -> bytes:
+    """Encode a JSON request body."""
+    return _dumps(data)
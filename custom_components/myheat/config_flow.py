@@ -16,7 +16,9 @@ import voluptuous as vol
 from .api import MhApiClient
 from .const import (
     CONF_API_KEY,
+    CONF_CLOUD_SUMMARY_POLLING,
     CONF_DEVICE_ID,
+    CONF_LOCAL_FETCH_MODE,
     CONF_LOCAL_HOST,
     CONF_LOCAL_MODE_ENABLED,
     CONF_LOCAL_PASSWORD,
@@ -26,10 +28,13 @@ from .const import (
     CONF_LOCAL_USERNAME,
     CONF_NAME,
     CONF_USERNAME,
+    DEFAULT_CLOUD_SUMMARY_POLLING,
+    DEFAULT_LOCAL_FETCH_MODE,
     DEFAULT_LOCAL_POLL_INTERVAL,
     DEFAULT_LOCAL_PROTOCOL,
     DEFAULT_LOCAL_REQUEST_TIMEOUT,
     DOMAIN,
+    LOCAL_FETCH_MODES,
     LOCAL_PROTOCOLS,
 )
 
@@ -185,6 +190,8 @@ class MhOptionsFlowHandler(OptionsFlow):
             CONF_LOCAL_PROTOCOL: DEFAULT_LOCAL_PROTOCOL,
             CONF_LOCAL_REQUEST_TIMEOUT: DEFAULT_LOCAL_REQUEST_TIMEOUT,
             CONF_LOCAL_POLL_INTERVAL: DEFAULT_LOCAL_POLL_INTERVAL,
+            CONF_LOCAL_FETCH_MODE: DEFAULT_LOCAL_FETCH_MODE,
+            CONF_CLOUD_SUMMARY_POLLING: DEFAULT_CLOUD_SUMMARY_POLLING,
             **self.config_entry.options,
         }
 
@@ -229,6 +236,20 @@ class MhOptionsFlowHandler(OptionsFlow):
                             DEFAULT_LOCAL_POLL_INTERVAL,
                         ),
                     ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+                    vol.Required(
+                        CONF_LOCAL_FETCH_MODE,
+                        default=options.get(
+                            CONF_LOCAL_FETCH_MODE,
+                            DEFAULT_LOCAL_FETCH_MODE,
+                        ),
+                    ): vol.In(LOCAL_FETCH_MODES),
+                    vol.Required(
+                        CONF_CLOUD_SUMMARY_POLLING,
+                        default=options.get(
+                            CONF_CLOUD_SUMMARY_POLLING,
+                            DEFAULT_CLOUD_SUMMARY_POLLING,
+                        ),
+                    ): bool,
                 }
             ),
             errors=errors,
@@ -37,12 +37,48 @@ PLATFORMS = [
 # Defaults
 DEFAULT_NAME = DOMAIN
 DEFAULT_CLOUD_POLL_INTERVAL = 30
+DEFAULT_CLOUD_FULL_POLL_INTERVAL = 300
+DEFAULT_CLOUD_SUMMARY_POLLING = False
+DEFAULT_POLL_JITTER = 1.0
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 3
+DEFAULT_BREAKER_BASE_BACKOFF = 30
+DEFAULT_BREAKER_MAX_BACKOFF = 900
+DEFAULT_CLOUD_RATE_LIMIT = 0.5  # requests per second
+DEFAULT_CLOUD_BURST = 10
+DEFAULT_CLOUD_WRITE_RESERVE = 3
+DEFAULT_FIRST_REFRESH_STAGGER = 1.0
+DEFAULT_FIRST_REFRESH_MAX_DELAY = 5.0
+DEFAULT_CLOUD_MAX_CONCURRENT_REQUESTS = 2
 DEFAULT_LOCAL_POLL_INTERVAL = 10
+DEFAULT_LOCAL_STATE_POLL_INTERVAL = 600
 DEFAULT_LOCAL_PROTOCOL = "http"
 DEFAULT_LOCAL_REQUEST_TIMEOUT = 15
+DEFAULT_LOCAL_FETCH_MODE = "parallel"
+DEFAULT_LOCAL_MAX_CONCURRENT_REQUESTS = 3
+# Seconds after an accepted write at which its result is read back
+DEFAULT_LOCAL_VERIFY_SCHEDULE = (0.2, 0.5, 1.0)
+DEFAULT_WRITE_COALESCE_WINDOW = 0.5
 
 LOCAL_SENTINEL = -16777216
 
+# Local session cookie persisted per config entry
+LOCAL_SESSION_STORAGE_KEY = f"{DOMAIN}.local_session"
+LOCAL_SESSION_STORAGE_VERSION = 1
+LOCAL_SESSION_SAVE_DELAY = 10
+
+# Cloud circuit breaker states
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+BREAKER_STATES = [BREAKER_CLOSED, BREAKER_OPEN, BREAKER_HALF_OPEN]
+
+# Data sources merged into the coordinator snapshot
+SOURCE_CLOUD = "cloud"
+SOURCE_LOCAL = "local"
+SOURCES = frozenset({SOURCE_CLOUD, SOURCE_LOCAL})
+
+CONF_CLOUD_SUMMARY_POLLING = "cloud_summary_polling"
+CONF_LOCAL_FETCH_MODE = "local_fetch_mode"
 CONF_LOCAL_MODE_ENABLED = "local_mode_enabled"
 CONF_LOCAL_HOST = "local_host"
 CONF_LOCAL_PASSWORD = "local_password"
@@ -53,6 +89,12 @@ CONF_LOCAL_USERNAME = "local_username"
 
 LOCAL_PROTOCOLS = ["http", "https"]
 
+# getObjState and getState are either requested at once or one after another
+# over the same keep-alive connection, for controllers that can't serve both.
+LOCAL_FETCH_MODE_PARALLEL = "parallel"
+LOCAL_FETCH_MODE_SEQUENTIAL = "sequential"
+LOCAL_FETCH_MODES = [LOCAL_FETCH_MODE_PARALLEL, LOCAL_FETCH_MODE_SEQUENTIAL]
+
 
 STARTUP_MESSAGE = f"""
 -------------------------------------------------------------------
@@ -3,15 +3,18 @@ import logging
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import DEFAULT_CLOUD_POLL_INTERVAL, DOMAIN  # noqa: F401
+from .scheduler import MhPollScheduler
 
 _LOGGER = logging.getLogger(__package__)
 
 SCAN_INTERVAL = timedelta(seconds=DEFAULT_CLOUD_POLL_INTERVAL)
 
+OBJECT_COLLECTIONS = ("heaters", "envs", "engs", "alarms")
+
 type MhConfigEntry = ConfigEntry[MhDataUpdateCoordinator]
 
 
@@ -24,9 +27,12 @@ class MhDataUpdateCoordinator(DataUpdateCoordinator[dict]):
         entry: MhConfigEntry,
         client: Any,
         scan_interval: timedelta = SCAN_INTERVAL,
+        scheduler: MhPollScheduler | None = None,
     ) -> None:
         """Initialize."""
         self.api = client
+        self._scan_interval = scan_interval
+        self._scheduler = scheduler
 
         super().__init__(
             hass,
@@ -34,12 +40,90 @@ class MhDataUpdateCoordinator(DataUpdateCoordinator[dict]):
             config_entry=entry,
             name=entry.title,
             update_interval=scan_interval,
-            always_update=True,
+            always_update=False,
         )
 
+        self._index: dict[str, dict[int, dict]] = {}
+        self._index_data: dict | None = None
+        self._notified_versions: dict[str, int] | None = None
+        self._notified_success: bool | None = None
+        # set once the entity platforms are set up with the first data
+        self.platforms_loaded = False
+
+        client.set_update_callback(self._handle_source_update)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update listeners fed by the sources that changed since last time.
+
+        Listeners are registered with the set of sources they read as context.
+        """
+        versions = self.api.source_versions()
+        changed: set[str] | None = None
+        if (
+            self._notified_versions is not None
+            and self._notified_success == self.last_update_success
+        ):
+            changed = {
+                source
+                for source, version in versions.items()
+                if self._notified_versions.get(source) != version
+            }
+        self._notified_versions = versions
+        self._notified_success = self.last_update_success
+
+        for update_callback, sources in list(self._listeners.values()):
+            if changed is None or sources is None or not changed.isdisjoint(sources):
+                update_callback()
+
+    @callback
+    def _handle_source_update(self) -> None:
+        """Publish merged data when a background source fetch lands.
+
+        async_set_updated_data() would reschedule the refresh timer, so the
+        data is published without touching the poll phase.
+        """
+        data = self.api.cached_device_info()
+        if data is not None and data != self.data:
+            self.data = data
+            self.async_update_listeners()
+
+    def get_object(self, collection: str, obj_id: int) -> dict:
+        """Return an object from the current snapshot by its id."""
+        if self._index_data is not self.data:
+            self._index = _build_index(self.data)
+            self._index_data = self.data
+        return self._index.get(collection, {}).get(obj_id, {})
+
+    async def async_shutdown(self) -> None:
+        """Cancel background fetches and shutdown the coordinator."""
+        self.api.shutdown()
+        await super().async_shutdown()
+
     async def _async_update_data(self) -> dict:
         """Update data via library."""
         try:
             return await self.api.async_get_device_info()
         except Exception as exception:
             raise UpdateFailed() from exception
+        finally:
+            if self._scheduler is not None and self.config_entry is not None:
+                # the next refresh is scheduled with the interval set here
+                self.update_interval = self._scheduler.next_interval(
+                    self.config_entry.entry_id,
+                    self._scan_interval,
+                    self.hass.loop.time(),
+                )
+
+
+def _build_index(data: dict | None) -> dict[str, dict[int, dict]]:
+    index: dict[str, dict[int, dict]] = {}
+    for collection in OBJECT_COLLECTIONS:
+        by_id: dict[int, dict] = {}
+        items = (data or {}).get(collection, [])
+        if isinstance(items, list):
+            for item in items:
+                if isinstance(item, dict) and "id" in item:
+                    by_id.setdefault(item["id"], item)
+        index[collection] = by_id
+    return index
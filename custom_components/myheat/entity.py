@@ -1,7 +1,9 @@
 """MhEntity class"""
 
 import logging
+from typing import Any
 
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -12,6 +14,7 @@ from .const import (
     DEFAULT_NAME,
     DOMAIN,
     MANUFACTURER,
+    SOURCES,
     VERSION,
 )
 from .coordinator import MhConfigEntry, MhDataUpdateCoordinator
@@ -20,13 +23,40 @@ _logger = logging.getLogger(__package__)
 
 
 class MhEntity(CoordinatorEntity[MhDataUpdateCoordinator]):
+    # Sources the entity state is derived from, only their updates wake it up
+    _mh_sources: frozenset[str] = SOURCES
+
     def __init__(
         self,
         coordinator: MhDataUpdateCoordinator,
         config_entry: MhConfigEntry,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=self._mh_sources)
         self.config_entry = config_entry
+        self._mh_written_state: tuple[Any, ...] | None = None
+
+    def _mh_state(self) -> tuple[Any, ...] | None:
+        """Return derived state compared between updates, None to always write."""
+        return None
+
+    def _mh_full_state(self) -> tuple[Any, ...] | None:
+        state = self._mh_state()
+        return None if state is None else (self.available, *state)
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._mh_written_state = self._mh_full_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the derived state has changed."""
+        state = self._mh_full_state()
+        if state is not None:
+            if state == self._mh_written_state:
+                return
+            self._mh_written_state = state
+        self.async_write_ha_state()
 
     @property
     def unique_id(self) -> str:
@@ -112,11 +142,7 @@ class MhHeaterEntity(MhEntity):
             _logger.warning("data not actual! %s", self.coordinator.data)
             return {}
 
-        for h in self.coordinator.data.get("heaters", []):
-            if h["id"] == self.heater_id:
-                return h
-
-        return {}
+        return self.coordinator.get_object("heaters", self.heater_id)
 
 
 class MhEnvEntity(MhEntity):
@@ -158,11 +184,7 @@ class MhEnvEntity(MhEntity):
             _logger.warning("data not actual! %s", self.coordinator.data)
             return {}
 
-        for e in self.coordinator.data.get("envs", []):
-            if e["id"] == self.env_id:
-                return e
-
-        return {}
+        return self.coordinator.get_object("envs", self.env_id)
 
 
 class MhEngEntity(MhEntity):
@@ -204,11 +226,7 @@ class MhEngEntity(MhEntity):
             _logger.warning("data not actual! %s", self.coordinator.data)
             return {}
 
-        for e in self.coordinator.data.get("engs", []):
-            if e["id"] == self.eng_id:
-                return e
-
-        return {}
+        return self.coordinator.get_object("engs", self.eng_id)
 
 
 class MhAlarmEntity(MhEntity):
@@ -254,12 +272,4 @@ class MhAlarmEntity(MhEntity):
             _logger.warning("data not actual! %s", self.coordinator.data)
             return {}
 
-        alarms = self.coordinator.data.get("alarms", [])
-        if not isinstance(alarms, list):
-            return {}
-
-        for alarm in alarms:
-            if alarm["id"] == self.alarm_id:
-                return alarm
-
-        return {}
+        return self.coordinator.get_object("alarms", self.alarm_id)
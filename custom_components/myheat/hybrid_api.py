@@ -3,15 +3,21 @@
 from __future__ import annotations
 
 import asyncio
-import copy
 import logging
 import time
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable
 
+from .breaker import CircuitOpenError
 from .const import (
     DEFAULT_CLOUD_POLL_INTERVAL,
+    DEFAULT_LOCAL_FETCH_MODE,
     DEFAULT_LOCAL_POLL_INTERVAL,
+    DEFAULT_LOCAL_STATE_POLL_INTERVAL,
+    DEFAULT_WRITE_COALESCE_WINDOW,
+    LOCAL_FETCH_MODE_PARALLEL,
     LOCAL_SENTINEL,
+    SOURCE_CLOUD,
+    SOURCE_LOCAL,
 )
 from .local_api import LocalApiError, LocalResponseError, LocalValidationError
 
@@ -212,11 +218,36 @@ def _map_alarm(obj: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+LOCAL_OBJECT_MAPPERS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "heaters": _map_heater,
+    "envs": _map_env,
+    "engs": _map_eng,
+    "alarms": _map_alarm,
+}
+
+
 def normalize_local_device_info(
     obj_state: dict[str, Any],
     device_state: dict[str, Any] | None = None,
+    previous: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    """Convert local UI API state into the cloud-shaped integration model."""
+    """Convert local UI API state into the cloud-shaped integration model.
+
+    Object collections equal to the ones `previous` was built from keep the
+    previous lists, so merges memoized on list identity can reuse them.
+    """
+
+    previous_raw = previous["local"]["objectState"] if previous is not None else {}
+    raw_objects: dict[str, list] = {}
+    objects: dict[str, list] = {}
+    for key, map_object in LOCAL_OBJECT_MAPPERS.items():
+        raw = obj_state.get(key, [])
+        if previous is not None and raw == previous_raw.get(key):
+            raw_objects[key] = previous_raw[key]
+            objects[key] = previous[key]
+        else:
+            raw_objects[key] = raw
+            objects[key] = [map_object(obj) for obj in raw]
 
     severity = _clean_int(obj_state.get("deviceSeverity"))
     local: dict[str, Any] = {
@@ -228,20 +259,19 @@ def normalize_local_device_info(
         "curves": obj_state.get("curves", []),
         "hModes": obj_state.get("hModes", []),
         "scheds": obj_state.get("scheds", []),
-        "objectState": {
-            key: obj_state.get(key, []) for key in ("envs", "heaters", "engs", "alarms")
-        },
+        "objectState": raw_objects,
         "deviceState": _safe_device_state(device_state),
     }
 
     if "securityArmed" in obj_state:
         local["securityArmed"] = bool(obj_state["securityArmed"])
+    if "hMode" in obj_state:
+        local["heatingMode"] = _clean_int(obj_state["hMode"])
+    if "sched" in obj_state:
+        local["schedule"] = _clean_int(obj_state["sched"])
 
     data = {
-        "heaters": [_map_heater(obj) for obj in obj_state.get("heaters", [])],
-        "envs": [_map_env(obj) for obj in obj_state.get("envs", [])],
-        "engs": [_map_eng(obj) for obj in obj_state.get("engs", [])],
-        "alarms": [_map_alarm(obj) for obj in obj_state.get("alarms", [])],
+        **objects,
         "dataActual": True,
         "severity": severity,
         "severityDesc": _severity_desc(severity),
@@ -258,29 +288,65 @@ def normalize_local_device_info(
     return data
 
 
+def _same_value(current: Any, requested: Any) -> bool:
+    if current is None or requested is None:
+        return False
+    try:
+        return float(current) == float(requested)
+    except TypeError, ValueError:
+        return current == requested
+
+
+def _eng_mode(value: Any) -> int | None:
+    if value is None:
+        return None
+    return -1 if _is_sentinel(value) or value == -1 else _clean_int(value)
+
+
+def _eng_goal_set(eng: dict[str, Any], goal: Any) -> bool:
+    settings = eng.get("local", {}).get("settings")
+    if settings is not None and "p3008" not in settings:
+        # without the mode setting the local mode is unknown
+        return False
+    mode = _eng_mode(eng.get("mode"))
+    return mode is not None and mode == _eng_mode(goal)
+
+
+async def _async_get_device_state(local: LocalApiClient) -> dict[str, Any] | None:
+    try:
+        return await local.async_get_state()
+    except LocalApiError, asyncio.TimeoutError:
+        return None
+
+
 def _merge_list(
     cloud_items: list[dict[str, Any]],
     local_items: list[dict[str, Any]],
 ) -> list[dict[str, Any]]:
-    result = [copy.deepcopy(item) for item in cloud_items]
-    by_id = {
-        item.get("id"): item
-        for item in result
+    # Items are shared with the source snapshots; only cloud items that get
+    # local fields overlaid are shallow-copied.
+    result = list(cloud_items)
+    index = {
+        item.get("id"): pos
+        for pos, item in enumerate(result)
         if isinstance(item, dict) and item.get("id") is not None
     }
 
     for local_item in local_items:
         local_id = local_item.get("id")
-        if local_id in by_id:
-            merged = by_id[local_id]
+        if local_id in index:
+            pos = index[local_id]
+            merged = result[pos]
+            if merged is cloud_items[pos]:
+                merged = result[pos] = dict(merged)
             for key, value in local_item.items():
                 if key in ("local", "localControl", "minTemp", "maxTemp"):
-                    merged[key] = copy.deepcopy(value)
+                    merged[key] = value
                 elif key not in merged or merged[key] is None:
-                    merged[key] = copy.deepcopy(value)
+                    merged[key] = value
             continue
 
-        result.append(copy.deepcopy(local_item))
+        result.append(local_item)
 
     return result
 
@@ -288,20 +354,35 @@ def _merge_list(
 def merge_local_device_info(
     cloud_data: dict[str, Any] | None,
     local_data: dict[str, Any] | None,
+    memo: dict[str, tuple[list, list, list]] | None = None,
 ) -> dict[str, Any]:
-    """Merge optional local data into cloud-shaped data."""
+    """Merge optional local data into cloud-shaped data.
+
+    The result shares unchanged objects with the inputs, so neither the
+    inputs nor the result may be mutated afterwards. When `memo` is given,
+    merged object collections are kept there and reused on the next call if
+    both input lists are the same objects.
+    """
 
     if cloud_data is None:
-        return copy.deepcopy(local_data or {})
+        return dict(local_data or {})
     if local_data is None:
-        return copy.deepcopy(cloud_data)
+        return dict(cloud_data)
 
-    result = copy.deepcopy(cloud_data)
+    result = dict(cloud_data)
 
     for key in ("heaters", "envs", "engs", "alarms"):
-        result[key] = _merge_list(result.get(key, []), local_data.get(key, []))
-
-    result["local"] = copy.deepcopy(local_data.get("local", {}))
+        cloud_items = result.get(key, [])
+        local_items = local_data.get(key, [])
+        if memo is not None and (cached := memo.get(key)) is not None:
+            if cached[0] is cloud_items and cached[1] is local_items:
+                result[key] = cached[2]
+                continue
+        result[key] = _merge_list(cloud_items, local_items)
+        if memo is not None:
+            memo[key] = (cloud_items, local_items, result[key])
+
+    result["local"] = local_data.get("local", {})
     if result.get("severity") is None:
         result["severity"] = local_data.get("severity")
         result["severityDesc"] = local_data.get("severityDesc")
@@ -319,15 +400,91 @@ class MhHybridApiClient:
         local_client: LocalApiClient | None = None,
         cloud_poll_interval: int = DEFAULT_CLOUD_POLL_INTERVAL,
         local_poll_interval: int = DEFAULT_LOCAL_POLL_INTERVAL,
+        local_fetch_mode: str = DEFAULT_LOCAL_FETCH_MODE,
+        local_state_poll_interval: int = DEFAULT_LOCAL_STATE_POLL_INTERVAL,
+        cloud_full_poll_interval: int | None = None,
+        write_coalesce_window: float = DEFAULT_WRITE_COALESCE_WINDOW,
     ) -> None:
         self.cloud = cloud_client
         self.local = local_client
         self._cloud_poll_interval = cloud_poll_interval
         self._local_poll_interval = local_poll_interval
+        self._local_fetch_mode = local_fetch_mode
+        self._local_state_poll_interval = local_state_poll_interval
+        self._cloud_full_poll_interval = cloud_full_poll_interval
+        self._write_coalesce_window = write_coalesce_window
+        self.local_fetch_duration: float | None = None
         self._cloud_cache: dict[str, Any] | None = None
         self._local_cache: dict[str, Any] | None = None
+        self._cloud_version = 0
+        self._local_version = 0
+        self._merged: dict[str, Any] | None = None
+        self._merged_versions: tuple[int, int] | None = None
+        self._merged_lists: dict[str, tuple[list, list, list]] = {}
         self._cloud_updated_at = 0.0
+        self._cloud_full_updated_at = 0.0
         self._local_updated_at = 0.0
+        self._local_device_state: dict[str, Any] | None = None
+        self._local_sources: tuple[Any, Any] | None = None
+        self._local_device_state_updated_at = 0.0
+        self._cloud_error: Exception | None = None
+        self._cloud_task: asyncio.Task | None = None
+        self._cloud_detached = False
+        self._closed = False
+        self._update_callback: Callable[[], None] | None = None
+        self._pending_env_goals: dict[tuple, tuple[asyncio.Task, dict]] = {}
+        self._env_goal_writes: dict[tuple, asyncio.Task] = {}
+
+    def set_update_callback(self, update_callback: Callable[[], None] | None) -> None:
+        """Register a callback for cloud data landing after a tick returned."""
+
+        self._update_callback = update_callback
+
+    def cached_device_info(self) -> dict[str, Any] | None:
+        """Return merged data from the cached snapshots without polling."""
+
+        if self._cloud_cache is None and self._local_cache is None:
+            return None
+        return self._merge_cached()
+
+    def source_versions(self) -> dict[str, int]:
+        """Return the version of each cached source snapshot."""
+
+        return {
+            SOURCE_CLOUD: self._cloud_version,
+            SOURCE_LOCAL: self._local_version,
+        }
+
+    def _merge_cached(self) -> dict[str, Any]:
+        versions = (self._cloud_version, self._local_version)
+        if self._merged is None or self._merged_versions != versions:
+            self._merged = merge_local_device_info(
+                self._cloud_cache,
+                self._local_cache,
+                self._merged_lists,
+            )
+            self._merged_versions = versions
+        return self._merged
+
+    def _set_cloud_cache(self, data: dict[str, Any] | None) -> None:
+        self._cloud_cache = data
+        self._cloud_version += 1
+
+    def _set_local_cache(self, data: dict[str, Any] | None) -> None:
+        self._local_cache = data
+        self._local_version += 1
+
+    def shutdown(self) -> None:
+        """Cancel a cloud fetch and coalesced writes that are still pending."""
+
+        self._closed = True
+        if self._cloud_task is not None and not self._cloud_task.done():
+            self._cloud_task.cancel()
+        self._cloud_task = None
+        for task in self._env_goal_writes.values():
+            task.cancel()
+        self._pending_env_goals.clear()
+        self._env_goal_writes.clear()
 
     async def async_get_devices(self) -> dict[str, Any]:
         """Get cloud devices."""
@@ -335,18 +492,43 @@ class MhHybridApiClient:
         return await self.cloud.async_get_devices()
 
     async def async_get_device_info(self, *, device_id: int | None = None) -> dict:
-        """Poll cloud and optional local data."""
+        """Poll cloud and optional local data.
+
+        Both sources are fetched concurrently. Once a cloud snapshot exists, a
+        slow cloud request no longer holds back the local tick: it keeps
+        running in the background and the update callback is fired when it
+        lands.
+        """
 
         now = time.monotonic()
         cloud_error = None
-        try:
-            cloud_data = await self._get_cloud_data(now, device_id=device_id)
-        except Exception as ex:  # pylint: disable=broad-except
-            cloud_error = ex
-            cloud_data = None
-            _LOGGER.warning("Cloud MY HEAT API unavailable: %s", ex)
 
-        local_data = await self._get_local_data(now)
+        if device_id is not None:
+            cloud_fetch = asyncio.ensure_future(
+                self.cloud.async_get_device_info(device_id=device_id)
+            )
+            local_data = await self._get_local_data(now)
+            try:
+                cloud_data = await cloud_fetch
+            except Exception as ex:  # pylint: disable=broad-except
+                cloud_error = ex
+                cloud_data = None
+                _LOGGER.warning("Cloud MY HEAT API unavailable: %s", ex)
+        else:
+            first_fetch = self._cloud_cache is None and self._cloud_error is None
+            cloud_fetch = self._ensure_cloud_refresh(now)
+            local_data = await self._get_local_data(now)
+            if cloud_fetch is not None and not cloud_fetch.done():
+                if self.local is None or local_data is None or first_fetch:
+                    await asyncio.wait((cloud_fetch,))
+                    # a write cancelled the fetch, read the new state instead
+                    while cloud_fetch.cancelled() and not self._closed:
+                        cloud_fetch = self._ensure_cloud_refresh(time.monotonic())
+                        await asyncio.wait((cloud_fetch,))
+                else:
+                    self._cloud_detached = True
+            cloud_data = self._cloud_cache
+            cloud_error = self._cloud_error
 
         if cloud_data is None and local_data is None:
             if cloud_error is not None:
@@ -355,25 +537,72 @@ class MhHybridApiClient:
                 "Both cloud and local MY HEAT APIs are unavailable"
             )
 
-        return merge_local_device_info(cloud_data, local_data)
-
-    async def _get_cloud_data(
-        self,
-        now: float,
-        *,
-        device_id: int | None,
-    ) -> dict[str, Any] | None:
         if device_id is not None:
-            return await self.cloud.async_get_device_info(device_id=device_id)
+            return merge_local_device_info(cloud_data, local_data)
+        return self._merge_cached()
+
+    def _ensure_cloud_refresh(self, now: float) -> asyncio.Task | None:
+        if self._cloud_task is not None and not self._cloud_task.done():
+            return self._cloud_task
+
+        if (
+            self._cloud_cache is not None
+            and now - self._cloud_updated_at < self._cloud_poll_interval
+        ):
+            return None
+
+        self._cloud_detached = False
+        self._cloud_task = asyncio.get_running_loop().create_task(
+            self._async_refresh_cloud(now)
+        )
+        return self._cloud_task
+
+    async def _async_fetch_cloud(self, now: float) -> dict[str, Any]:
+        """Fetch device info, or only the getDevices summary when it may do.
+
+        With a full poll interval set, the cached device info is kept until
+        that interval passes or the summary reports another severity.
+        """
 
         if (
-            self._cloud_cache is None
-            or now - self._cloud_updated_at >= self._cloud_poll_interval
+            self._cloud_full_poll_interval is not None
+            and self._cloud_cache is not None
+            and now - self._cloud_full_updated_at < self._cloud_full_poll_interval
         ):
-            self._cloud_cache = await self.cloud.async_get_device_info()
+            summary = await self.cloud.async_get_device_summary()
+            if summary is not None and (
+                summary.get("severity") == self._cloud_cache.get("severity")
+            ):
+                return self._cloud_cache
+            _LOGGER.debug("Cloud summary changed, fetching device info")
+
+        data = await self.cloud.async_get_device_info()
+        self._cloud_full_updated_at = now
+        return data
+
+    async def _async_refresh_cloud(self, now: float) -> None:
+        try:
+            data = await self._async_fetch_cloud(now)
+        except Exception as ex:  # pylint: disable=broad-except
+            if self._cloud_task is not asyncio.current_task():
+                return
+            self._set_cloud_cache(None)
+            self._cloud_error = ex
+            # while the circuit is open the failure was already reported
+            log = _LOGGER.debug if isinstance(ex, CircuitOpenError) else _LOGGER.warning
+            log("Cloud MY HEAT API unavailable: %s", ex)
+        else:
+            if self._cloud_task is not asyncio.current_task():
+                return
+            if data is not self._cloud_cache:
+                self._set_cloud_cache(data)
             self._cloud_updated_at = now
+            self._cloud_error = None
 
-        return self._cloud_cache
+        if self._cloud_detached:
+            self._cloud_detached = False
+            if self._update_callback is not None:
+                self._update_callback()
 
     async def _get_local_data(self, now: float) -> dict[str, Any] | None:
         if self.local is None:
@@ -385,27 +614,83 @@ class MhHybridApiClient:
         ):
             return self._local_cache
 
+        fetch_device_state = (
+            self._local_device_state is None
+            or now - self._local_device_state_updated_at
+            >= self._local_state_poll_interval
+        )
+        started = time.monotonic()
         try:
-            obj_state = await self.local.async_get_obj_state()
-            try:
-                device_state = await self.local.async_get_state()
-            except LocalApiError, asyncio.TimeoutError:
-                device_state = {}
-
-            self._local_cache = normalize_local_device_info(obj_state, device_state)
+            if not fetch_device_state:
+                obj_state = await self.local.async_get_obj_state()
+                device_state = None
+            elif self._local_fetch_mode == LOCAL_FETCH_MODE_PARALLEL:
+                # both requests wait for one shared login, see _ensure_authenticated()
+                obj_state, device_state = await asyncio.gather(
+                    self.local.async_get_obj_state(),
+                    _async_get_device_state(self.local),
+                )
+            else:
+                obj_state = await self.local.async_get_obj_state()
+                device_state = await _async_get_device_state(self.local)
+
+            if device_state is not None:
+                self._local_device_state = device_state
+                self._local_device_state_updated_at = now
+
+            self.local_fetch_duration = time.monotonic() - started
+            _LOGGER.debug(
+                "Local MY HEAT API %s fetch took %.3f s",
+                self._local_fetch_mode,
+                self.local_fetch_duration,
+            )
+            # unchanged responses come back as the same objects
+            sources = (obj_state, self._local_device_state)
+            if (
+                self._local_cache is None
+                or self._local_sources is None
+                or sources[0] is not self._local_sources[0]
+                or sources[1] is not self._local_sources[1]
+            ):
+                self._set_local_cache(
+                    normalize_local_device_info(*sources, self._local_cache)
+                )
+                self._local_sources = sources
             self._local_updated_at = now
             return self._local_cache
         except (LocalApiError, asyncio.TimeoutError) as ex:
-            self._local_cache = None
+            self._set_local_cache(None)
             _LOGGER.warning("Local MY HEAT API unavailable: %s", ex)
             return None
 
+    def _cached_object(
+        self, local: bool, collection: str, obj_id: int
+    ) -> dict[str, Any] | None:
+        """Return an object from the snapshot of the source a write goes to.
+
+        Writes invalidate that snapshot, so a value is only trusted once it
+        has been read back from the device.
+        """
+
+        data = self._local_cache if local else self._cloud_cache
+        for item in (data or {}).get(collection, []):
+            if isinstance(item, dict) and item.get("id") == obj_id:
+                return item
+        return None
+
     def _invalidate_cloud(self) -> None:
-        self._cloud_cache = None
+        # a fetch started before the write may return the old state
+        if self._cloud_task is not None and not self._cloud_task.done():
+            self._cloud_task.cancel()
+        self._cloud_task = None
+        self._cloud_detached = False
+        self._set_cloud_cache(None)
         self._cloud_updated_at = 0.0
+        self._cloud_full_updated_at = 0.0
+        self._cloud_error = None
 
     def _invalidate_local(self) -> None:
-        self._local_cache = None
+        self._set_local_cache(None)
         self._local_updated_at = 0.0
 
     async def async_set_env_goal(
@@ -415,8 +700,69 @@ class MhHybridApiClient:
         goal: int | float | None,
         device_id: int | None = None,
         change_mode: bool = False,
+        force: bool = False,
     ) -> None:
-        if self.local is not None and self.local.has_env(obj_id):
+        """Set an environment goal, coalescing changes made in quick succession.
+
+        Calls for the same object within the coalesce window only replace the
+        pending goal. A single write is sent and every caller gets its result.
+        """
+
+        key = (device_id, obj_id)
+        if (pending := self._pending_env_goals.get(key)) is not None:
+            task, kwargs = pending
+            kwargs["goal"] = goal
+            kwargs["change_mode"] = kwargs["change_mode"] or change_mode
+            kwargs["force"] = kwargs["force"] or force
+        else:
+            kwargs = {
+                "obj_id": obj_id,
+                "goal": goal,
+                "device_id": device_id,
+                "change_mode": change_mode,
+                "force": force,
+            }
+            task = asyncio.get_running_loop().create_task(
+                self._async_flush_env_goal(key, self._env_goal_writes.get(key))
+            )
+            self._pending_env_goals[key] = (task, kwargs)
+            self._env_goal_writes[key] = task
+            task.add_done_callback(lambda _: self._forget_env_goal_write(key, task))
+
+        # shielded, so a cancelled caller does not cancel the shared write
+        await asyncio.shield(task)
+
+    def _forget_env_goal_write(self, key: tuple, task: asyncio.Task) -> None:
+        if self._env_goal_writes.get(key) is task:
+            del self._env_goal_writes[key]
+
+    async def _async_flush_env_goal(
+        self, key: tuple, previous: asyncio.Task | None
+    ) -> None:
+        await asyncio.sleep(self._write_coalesce_window)
+        if previous is not None:
+            # keep writes to one object in order
+            await asyncio.wait((previous,))
+        _, kwargs = self._pending_env_goals.pop(key)
+        await self._async_write_env_goal(**kwargs)
+
+    async def _async_write_env_goal(
+        self,
+        *,
+        obj_id: int,
+        goal: int | float | None,
+        device_id: int | None = None,
+        change_mode: bool = False,
+        force: bool = False,
+    ) -> None:
+        local = self.local is not None and self.local.has_env(obj_id)
+        if not (force or change_mode or device_id is not None):
+            env = self._cached_object(local, "envs", obj_id)
+            if env is not None and _same_value(env.get("target"), goal):
+                _LOGGER.debug("Environment %s goal is already %s", obj_id, goal)
+                return
+
+        if local:
             await self.local.async_set_env_goal(
                 obj_id=obj_id,
                 goal=goal,
@@ -467,8 +813,16 @@ class MhHybridApiClient:
         goal: int | float,
         device_id: int | None = None,
         change_mode: bool = False,
+        force: bool = False,
     ) -> None:
-        if self.local is not None and self.local.has_eng(obj_id):
+        local = self.local is not None and self.local.has_eng(obj_id)
+        if not (force or change_mode or device_id is not None):
+            eng = self._cached_object(local, "engs", obj_id)
+            if eng is not None and _eng_goal_set(eng, goal):
+                _LOGGER.debug("Engineering %s goal is already %s", obj_id, goal)
+                return
+
+        if local:
             await self.local.async_set_eng_goal(
                 obj_id=obj_id,
                 goal=goal,
@@ -486,10 +840,18 @@ class MhHybridApiClient:
         await self.cloud.async_set_eng_goal(**kwargs)
         self._invalidate_cloud()
 
-    async def async_set_heater_enabled(self, *, obj_id: int, enabled: bool) -> None:
+    async def async_set_heater_enabled(
+        self, *, obj_id: int, enabled: bool, force: bool = False
+    ) -> None:
         if self.local is None or not self.local.has_heater(obj_id):
             raise LocalValidationError("Local heater control is not available")
 
+        if not force:
+            heater = self._cached_object(True, "heaters", obj_id)
+            if heater is not None and heater.get("disabled") is (not enabled):
+                _LOGGER.debug("Heater %s enabled is already %s", obj_id, enabled)
+                return
+
         await self.local.async_set_heater_enabled(obj_id=obj_id, enabled=enabled)
         self._invalidate_local()
 
@@ -499,6 +861,7 @@ class MhHybridApiClient:
         device_id: int | None = None,
         mode_id: int | None = None,
         schedule_id: int | None = None,
+        force: bool = False,
     ) -> None:
         if (
             self.local is not None
@@ -511,6 +874,17 @@ class MhHybridApiClient:
                 or self.local.has_schedule(schedule_id)
             )
         ):
+            current = (self._local_cache or {}).get("local", {})
+            if (
+                not force
+                and "heatingMode" in current
+                and "schedule" in current
+                and current["heatingMode"] == (-1 if mode_id is None else mode_id)
+                and current["schedule"] == (-1 if schedule_id is None else schedule_id)
+            ):
+                _LOGGER.debug("Heating mode is already %s/%s", mode_id, schedule_id)
+                return
+
             await self.local.async_set_heating_mode(
                 device_id=device_id,
                 mode_id=mode_id,
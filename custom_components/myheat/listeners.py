@@ -0,0 +1,20 @@
+"""Change listeners for API client state shown by diagnostic entities."""
+
+from typing import Callable
+
+
+class MhListenable:
+    """State that calls its listeners when it changes."""
+
+    def __init__(self) -> None:
+        self._listeners: list[Callable[[], None]] = []
+
+    def add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Listen for changes, returns a function removing the listener."""
+
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    def _notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
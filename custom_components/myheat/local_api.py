@@ -3,19 +3,31 @@
 from __future__ import annotations
 
 import asyncio
+from collections import Counter
 from http.cookies import SimpleCookie
 import logging
 import socket
+import time
 from typing import Any, Callable
 
 import aiohttp
 import voluptuous as vol
 
+from .codec import body_digest, decode_json, encode_json
 from .const import (
     DEFAULT_LOCAL_PROTOCOL,
     DEFAULT_LOCAL_REQUEST_TIMEOUT,
+    DEFAULT_LOCAL_VERIFY_SCHEDULE,
     LOCAL_SENTINEL,
 )
+from .listeners import MhListenable
+from .local_queue import (
+    PRIORITY_LOGIN,
+    PRIORITY_POLL,
+    PRIORITY_WRITE,
+    LocalRequestQueue,
+)
+from .validation import compile_validator
 
 _LOGGER = logging.getLogger(__package__)
 
@@ -78,6 +90,8 @@ LOCAL_OBJ_STATE_SCHEMA = vol.Schema(
     extra=vol.ALLOW_EXTRA,
 )
 
+LOCAL_OBJ_STATE_VALIDATOR = compile_validator(LOCAL_OBJ_STATE_SCHEMA)
+
 LOCAL_DEVICE_STATE_SCHEMA = vol.Schema(
     {
         vol.Optional("status"): vol.Any(int, bool),
@@ -92,6 +106,18 @@ LOCAL_DEVICE_STATE_SCHEMA = vol.Schema(
     extra=vol.ALLOW_EXTRA,
 )
 
+LOCAL_DEVICE_STATE_VALIDATOR = compile_validator(LOCAL_DEVICE_STATE_SCHEMA)
+
+LOCAL_INDEXED_COLLECTIONS = (
+    "envs",
+    "heaters",
+    "engs",
+    "alarms",
+    "curves",
+    "hModes",
+    "scheds",
+)
+
 LOCAL_WRITE_SCHEMA = vol.Schema(
     {
         vol.Required("status"): int,
@@ -100,6 +126,10 @@ LOCAL_WRITE_SCHEMA = vol.Schema(
 )
 
 
+# HTTP statuses returned for requests with an unknown or expired session
+LOCAL_SESSION_EXPIRED_STATUSES = (401, 403)
+
+
 class LocalApiError(Exception):
     """Base exception for the local UI API."""
 
@@ -125,7 +155,7 @@ class LocalVerificationError(LocalWriteError):
 
 
 def _validate_response(
-    schema: vol.Schema,
+    schema: Callable[[Any], Any],
     data: dict[str, Any],
     endpoint: str,
 ) -> dict[str, Any]:
@@ -137,6 +167,23 @@ def _validate_response(
         ) from ex
 
 
+def _decode_response(body: bytes, endpoint: str) -> dict[str, Any]:
+    try:
+        data = decode_json(body)
+    except ValueError as ex:
+        _LOGGER.exception("Invalid JSON from local API endpoint %s", endpoint)
+        raise LocalResponseError(f"Invalid local API JSON: {endpoint}") from ex
+
+    if not isinstance(data, dict):
+        raise LocalResponseError(f"Local API endpoint {endpoint} returned non-object")
+    return data
+
+
+def _server_error(sent: tuple[str | None, int, bytes, Any]) -> bool:
+    """Return whether a sent request got a server error, e.g. from overload."""
+    return sent[1] >= 500
+
+
 def _is_sentinel(value: Any) -> bool:
     try:
         return float(value) <= -16777215
@@ -181,6 +228,44 @@ def _is_nonzero(value: Any) -> bool:
         return False
 
 
+def _build_obj_index(
+    obj_state: dict[str, Any],
+) -> dict[str, dict[int, dict[str, Any]]]:
+    index: dict[str, dict[int, dict[str, Any]]] = {}
+    for collection in LOCAL_INDEXED_COLLECTIONS:
+        by_id: dict[int, dict[str, Any]] = {}
+        for obj in obj_state.get(collection, []):
+            if (obj_id := obj.get("i")) is not None:
+                by_id.setdefault(obj_id, obj)
+        index[collection] = by_id
+    return index
+
+
+class LocalVerificationStats(MhListenable):
+    """Number of reads needed to see local writes applied."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.attempts: Counter[int] = Counter()
+        self.failures = 0
+        self.last_attempts: int | None = None
+
+    @property
+    def average_attempts(self) -> float | None:
+        """Average reads of the verified writes."""
+        if not (verified := self.attempts.total()):
+            return None
+        return sum(n * count for n, count in self.attempts.items()) / verified
+
+    def record(self, attempts: int, *, verified: bool) -> None:
+        self.last_attempts = attempts
+        if verified:
+            self.attempts[attempts] += 1
+        else:
+            self.failures += 1
+        self._notify()
+
+
 class LocalApiClient:
     """Client for the device-local `/api/*` JSON API."""
 
@@ -193,15 +278,29 @@ class LocalApiClient:
         session: aiohttp.ClientSession,
         protocol: str = DEFAULT_LOCAL_PROTOCOL,
         request_timeout: int = DEFAULT_LOCAL_REQUEST_TIMEOUT,
+        session_id: str | None = None,
+        session_callback: Callable[[str], None] | None = None,
+        queue: LocalRequestQueue | None = None,
+        verify_schedule: tuple[float, ...] = DEFAULT_LOCAL_VERIFY_SCHEDULE,
     ) -> None:
         self._base_url = f"{protocol}://{host.strip().rstrip('/')}"
         self._username = username
         self._password = password
         self._session = session
         self._request_timeout = request_timeout
-        self._session_id: str | None = None
+        # a restored session is checked by the first request, see _request()
+        self._session_id: str | None = session_id
+        self._session_callback = session_callback
+        self._login_lock = asyncio.Lock()
+        self.queue = queue if queue is not None else LocalRequestQueue()
+        self._verify_schedule = verify_schedule
+        self.verification = LocalVerificationStats()
         self._obj_state: dict[str, Any] | None = None
+        self._obj_state_digest: bytes | None = None
+        self._obj_index: dict[str, dict[int, dict[str, Any]]] = {}
+        self._obj_index_state: dict[str, Any] | None = None
         self._device_state: dict[str, Any] | None = None
+        self._device_state_digest: bytes | None = None
 
     @property
     def authenticated(self) -> bool:
@@ -221,48 +320,89 @@ class LocalApiClient:
             headers["Cookie"] = f"EspSessId={self._session_id}"
         return headers
 
-    async def _post(
+    async def _request(
         self,
         endpoint: str,
         payload: dict[str, Any],
         *,
         auth: bool = True,
-    ) -> tuple[dict[str, Any], Any]:
+        relogin: bool = True,
+        priority: int = PRIORITY_WRITE,
+    ) -> tuple[bytes, Any]:
         if auth:
+            # outside of the queue, the login request needs a slot of its own
             await self._ensure_authenticated()
+        else:
+            priority = PRIORITY_LOGIN
+
+        session_id, status, body, headers = await self.queue.run(
+            lambda: self._send(endpoint, payload, auth=auth),
+            priority=priority,
+            key=endpoint,
+            failed=_server_error,
+        )
+
+        if auth and status in LOCAL_SESSION_EXPIRED_STATUSES:
+            if not relogin:
+                raise LocalAuthError(f"Local API session rejected by {endpoint}")
+            _LOGGER.debug("Local API session expired, logging in again")
+            await self._ensure_authenticated(expired=session_id)
+            return await self._request(
+                endpoint, payload, auth=auth, relogin=False, priority=priority
+            )
+
+        if status < 200 or status >= 300:
+            raise LocalResponseError(f"Local API endpoint {endpoint} returned {status}")
 
+        return body, headers
+
+    async def _send(
+        self,
+        endpoint: str,
+        payload: dict[str, Any],
+        *,
+        auth: bool,
+    ) -> tuple[str | None, int, bytes, Any]:
+        session_id = self._session_id if auth else None
         url = self._url(endpoint)
         try:
             async with asyncio.timeout(self._request_timeout):
                 response = await self._session.post(
                     url,
                     headers=self._headers(auth=auth),
-                    json=payload,
+                    data=encode_json(payload),
                 )
                 status = response.status
-                data = await response.json(content_type=None)
+                body = await response.read()
         except asyncio.TimeoutError, asyncio.CancelledError:
             _LOGGER.exception("Timeout calling local API endpoint %s", endpoint)
             raise
         except (aiohttp.ClientError, socket.gaierror) as ex:
             _LOGGER.exception("Error calling local API endpoint %s: %s", endpoint, ex)
             raise LocalResponseError(f"Local API request failed: {endpoint}") from ex
-        except ValueError as ex:
-            _LOGGER.exception("Invalid JSON from local API endpoint %s", endpoint)
-            raise LocalResponseError(f"Invalid local API JSON: {endpoint}") from ex
 
-        if status < 200 or status >= 300:
-            raise LocalResponseError(f"Local API endpoint {endpoint} returned {status}")
-        if not isinstance(data, dict):
-            raise LocalResponseError(
-                f"Local API endpoint {endpoint} returned non-object"
-            )
+        return session_id, status, body, response.headers
 
-        return data, response.headers
+    async def _post(
+        self,
+        endpoint: str,
+        payload: dict[str, Any],
+        *,
+        auth: bool = True,
+    ) -> tuple[dict[str, Any], Any]:
+        body, headers = await self._request(endpoint, payload, auth=auth)
+        return _decode_response(body, endpoint), headers
 
-    async def _ensure_authenticated(self) -> None:
-        if self._session_id is None:
-            await self.async_login()
+    async def _ensure_authenticated(self, *, expired: str | None = None) -> None:
+        """Login unless a session exists, other than the `expired` one.
+
+        Concurrent callers wait for the same login instead of starting theirs.
+        """
+        if self._session_id is not None and self._session_id != expired:
+            return
+        async with self._login_lock:
+            if self._session_id is None or self._session_id == expired:
+                await self._async_login()
 
     def _store_session_cookie(self, headers: Any) -> None:
         for value in headers.getall("Set-Cookie", []):
@@ -275,6 +415,10 @@ class LocalApiClient:
     async def async_login(self) -> None:
         """Login and store the returned EspSessId cookie."""
 
+        async with self._login_lock:
+            await self._async_login()
+
+    async def _async_login(self) -> None:
         self._session_id = None
         data, headers = await self._post(
             "/api/login",
@@ -288,21 +432,44 @@ class LocalApiClient:
         self._store_session_cookie(headers)
         if self._session_id is None:
             raise LocalAuthError("Local MY HEAT login did not return EspSessId")
+        if self._session_callback is not None:
+            self._session_callback(self._session_id)
 
     async def async_get_obj_state(self) -> dict[str, Any]:
-        """Fetch raw local object state."""
+        """Fetch raw local object state.
 
-        data, _ = await self._post("/api/getObjState", {})
-        data = _validate_response(LOCAL_OBJ_STATE_SCHEMA, data, "/api/getObjState")
+        The previous result object is returned when the body is unchanged.
+        """
+
+        return await self._async_fetch_obj_state(PRIORITY_POLL)
+
+    async def _async_fetch_obj_state(self, priority: int) -> dict[str, Any]:
+        body, _ = await self._request("/api/getObjState", {}, priority=priority)
+        digest = body_digest(body)
+        if self._obj_state is not None and digest == self._obj_state_digest:
+            return self._obj_state
+
+        data = _decode_response(body, "/api/getObjState")
+        data = _validate_response(LOCAL_OBJ_STATE_VALIDATOR, data, "/api/getObjState")
         self._obj_state = data
+        self._obj_state_digest = digest
         return data
 
     async def async_get_state(self) -> dict[str, Any]:
-        """Fetch raw local device diagnostics."""
+        """Fetch raw local device diagnostics.
+
+        The previous result object is returned when the body is unchanged.
+        """
+
+        body, _ = await self._request("/api/getState", {}, priority=PRIORITY_POLL)
+        digest = body_digest(body)
+        if self._device_state is not None and digest == self._device_state_digest:
+            return self._device_state
 
-        data, _ = await self._post("/api/getState", {})
-        data = _validate_response(LOCAL_DEVICE_STATE_SCHEMA, data, "/api/getState")
+        data = _decode_response(body, "/api/getState")
+        data = _validate_response(LOCAL_DEVICE_STATE_VALIDATOR, data, "/api/getState")
         self._device_state = data
+        self._device_state_digest = digest
         return data
 
     def _latest_obj_state(self) -> dict[str, Any]:
@@ -310,12 +477,34 @@ class LocalApiClient:
             raise LocalValidationError("Local object registry is not available yet")
         return self._obj_state
 
+    def _index(self, collection: str) -> dict[int, dict[str, Any]]:
+        if self._obj_state is None:
+            return {}
+        if self._obj_index_state is not self._obj_state:
+            self._obj_index = _build_obj_index(self._obj_state)
+            self._obj_index_state = self._obj_state
+        return self._obj_index.get(collection, {})
+
     def _find_object(self, collection: str, obj_id: int) -> dict[str, Any]:
-        for obj in self._latest_obj_state().get(collection, []):
-            if obj.get("i") == obj_id:
-                return obj
+        self._latest_obj_state()
+        if (obj := self._index(collection).get(obj_id)) is not None:
+            return obj
         raise LocalValidationError(f"Local object {obj_id} not found in {collection}")
 
+    def _find_updated_object(
+        self,
+        state: dict[str, Any],
+        collection: str,
+        obj_id: int,
+    ) -> dict[str, Any]:
+        if state is self._obj_state:
+            index = self._index(collection)
+        else:
+            index = _build_obj_index(state)[collection]
+        if (obj := index.get(obj_id)) is not None:
+            return obj
+        raise LocalVerificationError(f"Object {obj_id} disappeared from {collection}")
+
     def has_env(self, obj_id: int) -> bool:
         return self._has_object("envs", obj_id)
 
@@ -326,28 +515,16 @@ class LocalApiClient:
         return self._has_object("engs", obj_id)
 
     def _has_object(self, collection: str, obj_id: int) -> bool:
-        if self._obj_state is None:
-            return False
-        return any(
-            obj.get("i") == obj_id for obj in self._obj_state.get(collection, [])
-        )
+        return obj_id in self._index(collection)
 
     def has_curve(self, curve: int) -> bool:
-        if self._obj_state is None:
-            return False
-        return any(item.get("i") == curve for item in self._obj_state.get("curves", []))
+        return curve in self._index("curves")
 
     def has_heating_mode(self, mode: int) -> bool:
-        if self._obj_state is None:
-            return False
-        return any(item.get("i") == mode for item in self._obj_state.get("hModes", []))
+        return mode in self._index("hModes")
 
     def has_schedule(self, schedule: int) -> bool:
-        if self._obj_state is None:
-            return False
-        return any(
-            item.get("i") == schedule for item in self._obj_state.get("scheds", [])
-        )
+        return schedule in self._index("scheds")
 
     def supports_security(self) -> bool:
         return self._obj_state is not None and "securityArmed" in self._obj_state
@@ -362,9 +539,31 @@ class LocalApiClient:
         if type(data.get("status")) is not int or data.get("status") != 1:
             raise LocalWriteError("Local API rejected the command")
 
-        obj_state = await self.async_get_obj_state()
-        if verify is not None and not verify(obj_state):
-            raise LocalVerificationError("Local API state verification failed")
+        # There is no per-object read, so the whole state is read back until
+        # the written object matches. Unchanged bodies are not parsed again.
+        accepted_at = time.monotonic()
+        read_error: Exception | None = None
+        for attempt, offset in enumerate(self._verify_schedule, 1):
+            await asyncio.sleep(max(0.0, accepted_at + offset - time.monotonic()))
+            try:
+                # the read verifying a write goes ahead of queued polls
+                obj_state = await self._async_fetch_obj_state(PRIORITY_WRITE)
+            except (LocalResponseError, asyncio.TimeoutError) as ex:
+                # a failed read is a missed attempt, a later one may succeed
+                _LOGGER.debug("Local API read-back %d failed: %s", attempt, ex)
+                read_error = ex
+                continue
+            read_error = None
+            if verify is None:
+                return
+            if verify(obj_state):
+                self.verification.record(attempt, verified=True)
+                return
+
+        self.verification.record(len(self._verify_schedule), verified=False)
+        raise LocalVerificationError(
+            "Local API state verification failed"
+        ) from read_error
 
     async def async_set_env_goal(
         self,
@@ -391,7 +590,7 @@ class LocalApiClient:
         expected = None if goal is None else float(goal)
 
         def verify(state: dict[str, Any]) -> bool:
-            updated = _find_obj_in_state(state, "envs", obj_id)
+            updated = self._find_updated_object(state, "envs", obj_id)
             target = _clean_number(_setting(updated, "p3008"))
             if expected is None:
                 return target is None
@@ -426,7 +625,7 @@ class LocalApiClient:
             raise LocalValidationError("Unknown local curve")
 
         def verify(state: dict[str, Any]) -> bool:
-            updated = _find_obj_in_state(state, "envs", obj_id)
+            updated = self._find_updated_object(state, "envs", obj_id)
             return _clean_int(_setting(updated, "p3022")) == curve
 
         await self._write_and_verify(
@@ -457,7 +656,7 @@ class LocalApiClient:
             raise LocalValidationError("Unsupported local engineering mode")
 
         def verify(state: dict[str, Any]) -> bool:
-            updated = _find_obj_in_state(state, "engs", obj_id)
+            updated = self._find_updated_object(state, "engs", obj_id)
             if "p3008" in _state_map(updated, "s"):
                 current = _clean_int(_setting(updated, "p3008"))
                 return (current is None and value == LOCAL_SENTINEL) or current == value
@@ -480,7 +679,7 @@ class LocalApiClient:
         value = 0 if enabled else 1
 
         def verify(state: dict[str, Any]) -> bool:
-            updated = _find_obj_in_state(state, "heaters", obj_id)
+            updated = self._find_updated_object(state, "heaters", obj_id)
             return _clean_int(_setting(updated, "p3013")) == value
 
         await self._write_and_verify(
@@ -550,14 +749,3 @@ class LocalApiClient:
             },
             verify,
         )
-
-
-def _find_obj_in_state(
-    obj_state: dict[str, Any],
-    collection: str,
-    obj_id: int,
-) -> dict[str, Any]:
-    for obj in obj_state.get(collection, []):
-        if obj.get("i") == obj_id:
-            return obj
-    raise LocalVerificationError(f"Object {obj_id} disappeared from {collection}")
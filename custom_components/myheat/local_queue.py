@@ -0,0 +1,248 @@
+"""Prioritized request queue for the local controller API."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import heapq
+import itertools
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DEFAULT_LOCAL_MAX_CONCURRENT_REQUESTS, DOMAIN
+from .listeners import MhListenable
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+DATA_LOCAL_QUEUES = "local_queues"
+
+PRIORITY_LOGIN = 0
+PRIORITY_WRITE = 1
+PRIORITY_POLL = 2
+
+# Weight of the latest sample in the average wait time
+WAIT_SMOOTHING = 0.2
+
+# Latency above this multiple of the baseline counts as congestion
+LATENCY_TOLERANCE = 2.0
+# Weight of a slower sample when the latency baseline drifts up
+BASELINE_SMOOTHING = 0.05
+# Factor applied to the limit on congestion or errors
+LIMIT_DECREASE = 0.5
+
+
+class LocalConcurrencyLimit:
+    """In-flight request limit learned with AIMD.
+
+    Every request that finished while others were waiting and came back within
+    `LATENCY_TOLERANCE` of the best latency seen for its key adds 1/limit,
+    so the limit grows by one per limit-many requests. An error or a slow
+    response halves it, once for all requests started before the decrease.
+    Latency is compared per key (endpoint), as endpoints differ in cost.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_LOCAL_MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._limit = float(min_limit)
+        self._baselines: dict[str | None, float] = {}
+        self._decreased_at = 0.0
+
+    @property
+    def value(self) -> int:
+        """Number of requests allowed in flight."""
+        return int(self._limit)
+
+    def baseline(self, key: str | None = None) -> float | None:
+        """Best recent latency of requests with `key`, in seconds."""
+        return self._baselines.get(key)
+
+    def record(
+        self,
+        *,
+        started_at: float,
+        latency: float,
+        error: bool,
+        saturated: bool,
+        key: str | None = None,
+    ) -> None:
+        """Adjust the limit from the outcome of one request."""
+
+        baseline = self._baselines.get(key)
+        if not error:
+            if baseline is None or latency < baseline:
+                baseline = latency
+            else:
+                baseline += BASELINE_SMOOTHING * (latency - baseline)
+            self._baselines[key] = baseline
+
+        if error or latency > baseline * LATENCY_TOLERANCE:
+            if started_at >= self._decreased_at:
+                self._set(max(self.min_limit, self._limit * LIMIT_DECREASE))
+                self._decreased_at = time.monotonic()
+        elif saturated:
+            self._set(min(self.max_limit, self._limit + 1 / self._limit))
+
+    def _set(self, limit: float) -> None:
+        if int(limit) != self.value:
+            _LOGGER.debug("Local API concurrency limit %d -> %d", self.value, limit)
+        self._limit = limit
+
+
+class LocalRequestQueue(MhListenable):
+    """Runs requests to one controller with capped concurrency.
+
+    The cap follows `limit`. Waiting requests start in priority order, so
+    writes and the reads that verify them go ahead of background polls. A
+    poll still waiting in the queue is shared with later polls of the same
+    key instead of queueing a second, staler copy of it. There is one queue
+    per controller host, see async_get_local_queue().
+    """
+
+    def __init__(self, *, limit: LocalConcurrencyLimit | None = None) -> None:
+        super().__init__()
+        self.limit = limit if limit is not None else LocalConcurrencyLimit()
+        self._active = 0
+        self._waiting: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._queued_polls: dict[str, asyncio.Task] = {}
+        self.last_wait = 0.0
+        self.average_wait = 0.0
+
+    @property
+    def max_concurrency(self) -> int:
+        """Number of requests currently allowed in flight."""
+        return self.limit.value
+
+    @property
+    def depth(self) -> int:
+        """Number of requests waiting for a free slot."""
+        return len(self._waiting)
+
+    async def run(
+        self,
+        request: Callable[[], Awaitable[Any]],
+        *,
+        priority: int,
+        key: str | None = None,
+        failed: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Run `request` once a slot is free and return its result.
+
+        `key` names the kind of request, e.g. the endpoint: queued polls are
+        shared by it and latency is judged per key. `failed` tells whether a
+        returned result, e.g. a server error status, counts as an error for the
+        concurrency limit, as raised exceptions do.
+        """
+
+        if key is None or priority != PRIORITY_POLL:
+            return await self._run(request, priority, key, failed)
+
+        if (task := self._queued_polls.get(key)) is None:
+            task = asyncio.ensure_future(
+                self._run(request, priority, key, failed, shared=True)
+            )
+            self._queued_polls[key] = task
+            task.add_done_callback(lambda _: self._forget_poll(key, task))
+
+        # shielded, so a cancelled caller does not cancel the shared poll
+        return await asyncio.shield(task)
+
+    def _forget_poll(self, key: str, task: asyncio.Task) -> None:
+        if self._queued_polls.get(key) is task:
+            del self._queued_polls[key]
+
+    async def _run(
+        self,
+        request: Callable[[], Awaitable[Any]],
+        priority: int,
+        key: str | None = None,
+        failed: Callable[[Any], bool] | None = None,
+        *,
+        shared: bool = False,
+    ) -> Any:
+        await self._acquire(priority)
+        if shared and key is not None:
+            # started polls are not shared anymore, later ones are fresher
+            self._forget_poll(key, asyncio.current_task())
+        started_at = time.monotonic()
+        error: bool | None = None
+        try:
+            result = await request()
+            error = failed is not None and failed(result)
+            return result
+        except Exception:
+            error = True
+            raise
+        finally:
+            # a cancelled request tells nothing about the controller
+            if error is not None:
+                self.limit.record(
+                    started_at=started_at,
+                    latency=time.monotonic() - started_at,
+                    error=error,
+                    saturated=bool(self._waiting),
+                    key=key,
+                )
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        enqueued_at = time.monotonic()
+        if self._active < self.max_concurrency and not self._waiting:
+            self._active += 1
+            self._record_wait(0.0)
+            return
+
+        entry = (
+            priority,
+            next(self._counter),
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._waiting, entry)
+        self._notify()
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry[2].done() and not entry[2].cancelled():
+                # the slot was handed over just before the cancellation
+                self._release()
+            elif entry in self._waiting:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._notify()
+            raise
+        self._record_wait(time.monotonic() - enqueued_at)
+
+    def _release(self) -> None:
+        self._active -= 1
+        while self._waiting and self._active < self.max_concurrency:
+            _, _, waiter = heapq.heappop(self._waiting)
+            if not waiter.done():
+                self._active += 1
+                waiter.set_result(None)
+        self._notify()
+
+    def _record_wait(self, wait: float) -> None:
+        self.last_wait = wait
+        self.average_wait += WAIT_SMOOTHING * (wait - self.average_wait)
+        self._notify()
+
+
+@callback
+def async_get_local_queue(hass: HomeAssistant, host: str) -> LocalRequestQueue:
+    """Return the request queue of the controller at `host`.
+
+    Entries of one controller share it, so together they stay within the
+    learned limit, and it keeps that limit across entry reloads.
+    """
+
+    queues = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_LOCAL_QUEUES, {})
+    if (queue := queues.get(host)) is None:
+        queue = queues[host] = LocalRequestQueue()
+    return queue
@@ -0,0 +1,89 @@
+"""Client-side rate limiting of MyHeat cloud requests."""
+
+import asyncio
+from collections import deque
+import time
+
+from .const import (
+    DEFAULT_CLOUD_BURST,
+    DEFAULT_CLOUD_RATE_LIMIT,
+    DEFAULT_CLOUD_WRITE_RESERVE,
+)
+from .listeners import MhListenable
+
+METER_WINDOW = 3600
+
+
+class MhRateLimiter(MhListenable):
+    """Token bucket that prefers writes, with an hourly request meter.
+
+    Writes may take any token. Reads leave `write_reserve` tokens in the
+    bucket and wait for it to refill otherwise, so polling can not starve
+    user-initiated writes.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = DEFAULT_CLOUD_RATE_LIMIT,
+        burst: int = DEFAULT_CLOUD_BURST,
+        write_reserve: int = DEFAULT_CLOUD_WRITE_RESERVE,
+    ) -> None:
+        super().__init__()
+        self._rate = rate
+        self._burst = burst
+        self._write_reserve = min(write_reserve, burst - 1)
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._reads: deque[float] = deque()
+        self._writes: deque[float] = deque()
+        self.deferred_reads = 0
+
+    async def acquire(self, *, write: bool) -> None:
+        """Wait until a request of the given priority may be sent."""
+
+        need = 1.0 if write else 1.0 + self._write_reserve
+        deferred = False
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated_at) * self._rate
+            )
+            self._updated_at = now
+            if self._tokens >= need:
+                break
+            if not deferred and not write:
+                deferred = True
+                self.deferred_reads += 1
+            await asyncio.sleep((need - self._tokens) / self._rate)
+
+        self._tokens -= 1
+        (self._writes if write else self._reads).append(now)
+        self._notify()
+
+    def _trim(self, now: float) -> None:
+        for requests in (self._reads, self._writes):
+            while requests and now - requests[0] > METER_WINDOW:
+                requests.popleft()
+
+    @property
+    def reads_per_hour(self) -> int:
+        """Reads sent within the last hour."""
+        self._trim(time.monotonic())
+        return len(self._reads)
+
+    @property
+    def writes_per_hour(self) -> int:
+        """Writes sent within the last hour."""
+        self._trim(time.monotonic())
+        return len(self._writes)
+
+    @property
+    def requests_per_hour(self) -> int:
+        """Requests sent within the last hour."""
+        return self.reads_per_hour + self.writes_per_hour
+
+    @property
+    def utilization(self) -> float:
+        """Requests of the last hour, in percent of the hourly limit."""
+        return round(100 * self.requests_per_hour / (self._rate * METER_WINDOW), 1)
@@ -0,0 +1,100 @@
+"""Poll phase scheduling shared by the MyHeat config entries."""
+
+from datetime import timedelta
+import random
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DEFAULT_FIRST_REFRESH_MAX_DELAY,
+    DEFAULT_FIRST_REFRESH_STAGGER,
+    DEFAULT_POLL_JITTER,
+    DOMAIN,
+)
+
+DATA_SCHEDULER = "scheduler"
+
+
+def _spread(slot: int) -> float:
+    """Return the phase of a slot as a fraction of the interval.
+
+    Van der Corput sequence (0, 1/2, 1/4, 3/4, 1/8, ...), so the phases of
+    any number of slots stay evenly spread without knowing that number.
+    """
+    phase = 0.0
+    denom = 1
+    while slot:
+        denom *= 2
+        slot, bit = divmod(slot, 2)
+        phase += bit / denom
+    return phase
+
+
+class MhPollScheduler:
+    """Assigns each config entry a poll phase within its update interval.
+
+    Phases are kept relative to a common anchor, so entries do not tick in
+    lockstep, and the jitter added to every tick does not accumulate.
+    """
+
+    def __init__(
+        self,
+        anchor: float,
+        *,
+        jitter: float = DEFAULT_POLL_JITTER,
+        first_refresh_stagger: float = DEFAULT_FIRST_REFRESH_STAGGER,
+        first_refresh_max_delay: float = DEFAULT_FIRST_REFRESH_MAX_DELAY,
+    ) -> None:
+        self._anchor = anchor
+        self._jitter = jitter
+        self._first_refresh_stagger = first_refresh_stagger
+        self._first_refresh_max_delay = first_refresh_max_delay
+        self._slots: dict[str, int] = {}
+
+    @property
+    def entries(self) -> int:
+        """Number of scheduled entries."""
+        return len(self._slots)
+
+    def add(self, entry_id: str) -> int:
+        """Assign the lowest free slot to the entry and return it."""
+        if (slot := self._slots.get(entry_id)) is None:
+            used = set(self._slots.values())
+            slot = next(slot for slot in range(len(used) + 1) if slot not in used)
+            self._slots[entry_id] = slot
+        return slot
+
+    def remove(self, entry_id: str) -> None:
+        """Release the slot of the entry."""
+        self._slots.pop(entry_id, None)
+
+    def first_refresh_delay(self, entry_id: str) -> float:
+        """Return the delay before the first refresh of the entry."""
+        slot = self._slots.get(entry_id, 0)
+        if not slot:
+            return 0.0
+        delay = slot * self._first_refresh_stagger + random.uniform(0, self._jitter)
+        return min(delay, self._first_refresh_max_delay)
+
+    def next_interval(
+        self, entry_id: str, interval: timedelta, now: float
+    ) -> timedelta:
+        """Return the delay from `now` to the next jittered tick of the entry."""
+        seconds = interval.total_seconds()
+        phase = _spread(self._slots.get(entry_id, 0)) * seconds
+        delay = seconds - (now - self._anchor - phase) % seconds
+        if delay < seconds / 2:
+            # too close to the last tick, skip to the next phase
+            delay += seconds
+        jitter = min(self._jitter, seconds / 4)
+        return timedelta(seconds=delay + random.uniform(-jitter, jitter))
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> MhPollScheduler:
+    """Return the poll scheduler of the integration."""
+
+    data = hass.data.setdefault(DOMAIN, {})
+    if (scheduler := data.get(DATA_SCHEDULER)) is None:
+        scheduler = data[DATA_SCHEDULER] = MhPollScheduler(hass.loop.time())
+    return scheduler
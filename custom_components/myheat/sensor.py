@@ -1,20 +1,32 @@
 """Sensor platform for MyHeat."""
 
+from datetime import datetime, timedelta
 from itertools import chain
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.const import (
     PERCENTAGE,
     EntityCategory,
     UnitOfPressure,
     UnitOfTemperature,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 
 from .api import SENSOR_ENV_TYPES
+from .breaker import MhCircuitBreaker
+from .const import BREAKER_STATES, SOURCE_CLOUD, SOURCE_LOCAL
 from .coordinator import MhConfigEntry, MhDataUpdateCoordinator
 from .entity import MhEntity, MhEnvEntity, MhHeaterEntity
+from .listeners import MhListenable
+from .local_api import LocalVerificationStats
+from .local_queue import LocalRequestQueue
+from .ratelimit import MhRateLimiter
 
 
 async def async_setup_entry(
@@ -24,9 +36,16 @@ async def async_setup_entry(
 ) -> None:
     """Setup sensor platform."""
     coordinator: MhDataUpdateCoordinator = entry.runtime_data
+    cloud = coordinator.api.cloud
+    local = coordinator.api.local
 
     entities = chain(
-        (MhWeatherTempSensor(coordinator, entry),),
+        (
+            MhWeatherTempSensor(coordinator, entry),
+            MhCloudCircuitSensor(coordinator, entry, cloud.breaker),
+            MhCloudNextRetrySensor(coordinator, entry, cloud.breaker),
+            MhCloudRequestsSensor(coordinator, entry, cloud.limiter),
+        ),
         (
             sensor
             for sensor in (
@@ -35,6 +54,14 @@ async def async_setup_entry(
             )
             if sensor.available
         ),
+        (
+            (
+                MhLocalQueueSensor(coordinator, entry, local.queue),
+                MhLocalVerificationSensor(coordinator, entry, local.verification),
+            )
+            if local is not None
+            else ()
+        ),
         chain.from_iterable(
             [
                 MhHeaterFlowTempSensor(coordinator, entry, heater),
@@ -59,6 +86,7 @@ class MhWeatherTempSensor(MhEntity, SensorEntity):
     """myheat weatherTemp Sensor class."""
 
     _attr_icon = "mdi:weather-cloudy"
+    _mh_sources = frozenset({SOURCE_CLOUD})
     _attr_device_class = SensorDeviceClass.TEMPERATURE
     _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
 
@@ -83,6 +111,198 @@ class MhWeatherTempSensor(MhEntity, SensorEntity):
         }
 
 
+class MhClientDiagnosticSensor(MhEntity, SensorEntity):
+    """Diagnostics of an API client.
+
+    Updated by a listener on the source, or every `_mh_refresh_interval`
+    for sources that change with every request.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _mh_refresh_interval: timedelta | None = None
+
+    def __init__(
+        self,
+        coordinator: MhDataUpdateCoordinator,
+        config_entry: MhConfigEntry,
+        source: MhListenable,
+    ) -> None:
+        super().__init__(coordinator, config_entry)
+        self._source = source
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self._mh_refresh_interval is None:
+            self.async_on_remove(
+                self._source.add_listener(self._handle_coordinator_update)
+            )
+            return
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_refresh, self._mh_refresh_interval
+            )
+        )
+
+    @callback
+    def _async_refresh(self, _now: datetime) -> None:
+        self._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        return True
+
+
+class MhCloudBreakerSensor(MhClientDiagnosticSensor):
+    _source: MhCircuitBreaker
+
+
+class MhCloudCircuitSensor(MhCloudBreakerSensor):
+    _attr_icon = "mdi:cloud-alert"
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = BREAKER_STATES
+
+    def _mh_state(self) -> tuple:
+        return (self.native_value, self._source.failures)
+
+    @property
+    def name(self) -> str:
+        return f"{self._mh_name} cloud circuit"
+
+    @property
+    def unique_id(self) -> str:
+        return f"{super().unique_id}cloudCircuit"
+
+    @property
+    def native_value(self) -> str:
+        return self._source.state
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return {
+            "failures": self._source.failures,
+        }
+
+
+class MhCloudNextRetrySensor(MhCloudBreakerSensor):
+    _attr_icon = "mdi:cloud-refresh"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    def _mh_state(self) -> tuple:
+        return (self.native_value,)
+
+    @property
+    def name(self) -> str:
+        return f"{self._mh_name} cloud next retry"
+
+    @property
+    def unique_id(self) -> str:
+        return f"{super().unique_id}cloudNextRetry"
+
+    @property
+    def native_value(self) -> datetime | None:
+        return self._source.next_retry
+
+
+class MhCloudRequestsSensor(MhClientDiagnosticSensor):
+    _attr_icon = "mdi:cloud-upload"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "requests/h"
+
+    _source: MhRateLimiter
+    # the meter changes with every cloud request of the account
+    _mh_refresh_interval = timedelta(minutes=1)
+
+    def _mh_state(self) -> tuple:
+        return (self.native_value, self._source.deferred_reads)
+
+    @property
+    def name(self) -> str:
+        return f"{self._mh_name} cloud requests"
+
+    @property
+    def unique_id(self) -> str:
+        return f"{super().unique_id}cloudRequests"
+
+    @property
+    def native_value(self) -> int:
+        return self._source.requests_per_hour
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return {
+            "reads": self._source.reads_per_hour,
+            "writes": self._source.writes_per_hour,
+            "utilization": self._source.utilization,
+            "deferred_reads": self._source.deferred_reads,
+        }
+
+
+class MhLocalQueueSensor(MhClientDiagnosticSensor):
+    _attr_icon = "mdi:tray-full"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    _source: LocalRequestQueue
+    # the queue changes several times with every local request
+    _mh_refresh_interval = timedelta(minutes=1)
+
+    def _mh_state(self) -> tuple:
+        return (self.native_value, *self.extra_state_attributes.values())
+
+    @property
+    def name(self) -> str:
+        return f"{self._mh_name} local queue"
+
+    @property
+    def unique_id(self) -> str:
+        return f"{super().unique_id}localQueue"
+
+    @property
+    def native_value(self) -> int:
+        return self._source.depth
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return {
+            "limit": self._source.max_concurrency,
+            "last_wait": round(self._source.last_wait, 2),
+            "average_wait": round(self._source.average_wait, 2),
+        }
+
+
+class MhLocalVerificationSensor(MhClientDiagnosticSensor):
+    _attr_icon = "mdi:check-decagram"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    _source: LocalVerificationStats
+
+    def _mh_state(self) -> tuple:
+        return (self.native_value, self._source.last_attempts, self._source.failures)
+
+    @property
+    def name(self) -> str:
+        return f"{self._mh_name} local write verification"
+
+    @property
+    def unique_id(self) -> str:
+        return f"{super().unique_id}localVerification"
+
+    @property
+    def native_value(self) -> float | None:
+        average = self._source.average_attempts
+        return round(average, 2) if average is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return {
+            "last_attempts": self._source.last_attempts,
+            "failures": self._source.failures,
+            "attempts": {
+                str(attempts): count
+                for attempts, count in sorted(self._source.attempts.items())
+            },
+        }
+
+
 class MhEnvHumiditySensor(MhEnvEntity, SensorEntity):
     """Humidity environment sensor."""
 
@@ -96,6 +316,7 @@ class MhEnvHumiditySensor(MhEnvEntity, SensorEntity):
 
 class MhLocalSensor(MhEntity, SensorEntity):
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _mh_sources = frozenset({SOURCE_LOCAL})
     _local_key: str
 
     @property
@@ -53,6 +53,7 @@ async def async_set_env_goal(call: ServiceCall) -> ServiceResponse:
         obj_id=obj_id,
         goal=goal,
         change_mode=change_mode,
+        force=call.data.get("force", False),
     )
 
 
@@ -81,6 +82,7 @@ async def async_set_eng_goal(call: ServiceCall) -> ServiceResponse:
         obj_id=obj_id,
         goal=goal,
         change_mode=change_mode,
+        force=call.data.get("force", False),
     )
 
 
@@ -93,6 +95,7 @@ async def async_set_heating_mode(call: ServiceCall) -> ServiceResponse:
         device_id=device_id,
         mode_id=mode_id,
         schedule_id=schedule_id,
+        force=call.data.get("force", False),
     )
 
 
@@ -103,6 +106,7 @@ async def async_set_heater_enabled(call: ServiceCall) -> ServiceResponse:
     return await coordinator.api.async_set_heater_enabled(
         obj_id=obj_id,
         enabled=enabled,
+        force=call.data.get("force", False),
     )
 
 
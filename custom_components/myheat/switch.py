@@ -3,7 +3,7 @@
 from itertools import chain
 
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
 from .coordinator import MhConfigEntry, MhDataUpdateCoordinator
@@ -79,8 +79,5 @@ class MhHeaterEnabledSwitch(MhHeaterEntity, SwitchEntity):
         )
         await self.coordinator.async_request_refresh()
 
-    @callback
-    def _handle_coordinator_update(self):
-        """Write updated local heater state."""
-
-        self.async_write_ha_state()
+    def _mh_state(self) -> tuple:
+        return (self.is_on,)
@@ -0,0 +1,111 @@
+"""Fast-path validation for voluptuous response schemas."""
+
+from typing import Any, Callable
+
+import voluptuous as vol
+
+Check = Callable[[Any], bool]
+
+
+def compile_validator(schema: vol.Schema) -> Callable[[Any], Any]:
+    """Compile a schema into a validator that avoids rebuilding valid data.
+
+    The compiled check only accepts data the schema would return unchanged,
+    without coercions or inserted defaults, and returns it as is. Anything
+    else goes through the schema, which produces the result or the error.
+    """
+
+    check, _ = _compile(schema.schema, schema.extra, schema.required)
+
+    def validate(data: Any) -> Any:
+        if check(data):
+            return data
+        return schema(data)
+
+    return validate
+
+
+def _never(data: Any) -> bool:
+    return False
+
+
+def _compile(node: Any, extra: int, required: bool) -> tuple[Check, bool]:
+    """Return a check and whether a failed check means the schema rejects it.
+
+    Pure checks (types and literals) never transform data, so an `Any`
+    may try the next alternative after one of them failed.
+    """
+
+    if isinstance(node, vol.Schema):
+        return _compile(node.schema, node.extra, node.required)
+    if isinstance(node, type):
+        return (lambda data: isinstance(data, node)), True
+    if node is None or isinstance(node, (str, int, float)):
+        return (lambda data: data == node), True
+    if isinstance(node, vol.Any):
+        return _compile_any(node.validators, extra, required)
+    if isinstance(node, vol.Coerce):
+        return (lambda data: type(data) is node.type), False
+    if isinstance(node, list):
+        return _compile_list(node, extra, required), False
+    if isinstance(node, dict):
+        return _compile_dict(node, extra, required), False
+    return _never, False
+
+
+def _compile_any(validators: Any, extra: int, required: bool) -> tuple[Check, bool]:
+    alternatives = [_compile(item, extra, required) for item in validators]
+
+    def check(data: Any) -> bool:
+        for alternative, pure in alternatives:
+            if alternative(data):
+                return True
+            if not pure:
+                return False
+        return False
+
+    return check, all(pure for _, pure in alternatives)
+
+
+def _compile_list(node: list, extra: int, required: bool) -> Check:
+    if not node:
+        return _never
+
+    item_check, _ = _compile_any(node, extra, required)
+
+    def check(data: Any) -> bool:
+        return isinstance(data, list) and all(item_check(item) for item in data)
+
+    return check
+
+
+def _compile_dict(node: dict, extra: int, required: bool) -> Check:
+    fields: list[tuple[str, bool, Check]] = []
+    for key, value in node.items():
+        name = key.schema if isinstance(key, vol.Marker) else key
+        if not isinstance(name, str) or isinstance(
+            key, (vol.Exclusive, vol.Inclusive, vol.Remove)
+        ):
+            return _never
+        if isinstance(key, vol.Marker):
+            # keys with a default must be present, or the schema inserts it
+            must = isinstance(key, vol.Required) or key.default is not vol.UNDEFINED
+        else:
+            must = required
+        fields.append((name, must, _compile(value, extra, required)[0]))
+
+    names = frozenset(name for name, _, _ in fields)
+    allow_extra = extra == vol.ALLOW_EXTRA
+
+    def check(data: Any) -> bool:
+        if not isinstance(data, dict):
+            return False
+        for name, must, value_check in fields:
+            if name in data:
+                if not value_check(data[name]):
+                    return False
+            elif must:
+                return False
+        return allow_extra or names.issuperset(data)
+
+    return check
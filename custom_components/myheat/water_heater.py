@@ -119,8 +119,16 @@ class MhEnvWaterHeater(MhEnvEntity, WaterHeaterEntity):
             OPERATION_MODE_ON if target is not None else OPERATION_MODE_OFF
         )
 
+    def _mh_state(self) -> tuple:
+        return (
+            self._attr_current_temperature,
+            self._attr_target_temperature,
+            self._attr_current_operation,
+            self.extra_state_attributes["is_burning"],
+        )
+
     @callback
     def _handle_coordinator_update(self):
         """Get the latest state from the thermostat."""
         self._update_state_attrs()
-        self.async_write_ha_state()
+        super()._handle_coordinator_update()
@@ -7,6 +7,27 @@ import pytest
 from .const import MOCK_GET_DEVICE_INFO, MOCK_GET_DEVICES
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--perf", action="store_true", help="run wall-clock timing benchmarks"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "perf: wall-clock timing benchmark, skipped unless --perf"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--perf"):
+        return
+    skip_perf = pytest.mark.skip(reason="timing benchmark, run with --perf")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip_perf)
+
+
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):
     yield
@@ -1,25 +1,62 @@
 """Tests for MyHeat api."""
 
 import asyncio
+import json
 
 import aiohttp
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import pytest
 
-from custom_components.myheat.api import RPC_ENDPOINT, MhApiClient
+from custom_components.myheat.account import MhAccount
+from custom_components.myheat.api import RPC_ENDPOINT, RPC_READ_ACTIONS, MhApiClient
+from custom_components.myheat.breaker import CircuitOpenError
+from custom_components.myheat.const import BREAKER_OPEN
 
 from .const import MOCK_GET_DEVICE_INFO, MOCK_GET_DEVICES, MOCK_NO_ERR
 
 
-def api_client(hass) -> MhApiClient:
+def api_client(hass, device_id=12, account=None) -> MhApiClient:
     return MhApiClient(
         username="test_user",
         api_key="test_api_key",
-        device_id=12,
+        device_id=device_id,
         session=async_get_clientsession(hass),
+        account=account,
     )
 
 
+class MockResponse:
+    """Response returning a fixed JSON body."""
+
+    def __init__(self, payload):
+        self._body = json.dumps(payload).encode()
+
+    async def read(self):
+        return self._body
+
+
+class GatedSession:
+    """Session holding every read until released, tracking concurrency."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def post(self, url, *, headers, data):
+        self.calls += 1
+        if json.loads(data)["action"] not in RPC_READ_ACTIONS:
+            return MockResponse(MOCK_NO_ERR)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.release.wait()
+        finally:
+            self.active -= 1
+        return MockResponse(MOCK_GET_DEVICE_INFO)
+
+
 async def test_api_get_devices(
     hass,
     aioclient_mock,
@@ -31,6 +68,20 @@ async def test_api_get_devices(
     assert await api.async_get_devices() == MOCK_GET_DEVICES["data"]
 
 
+async def test_api_get_device_summary(
+    hass,
+    aioclient_mock,
+):
+    """Test the device summary is taken from getDevices."""
+    api = api_client(hass)
+
+    aioclient_mock.post(RPC_ENDPOINT, json=MOCK_GET_DEVICES)
+    assert (
+        await api.async_get_device_summary() == MOCK_GET_DEVICES["data"]["devices"][0]
+    )
+    assert await api.async_get_device_summary(device_id=99) is None
+
+
 async def test_api_get_device_info(
     hass,
     aioclient_mock,
@@ -42,6 +93,112 @@ async def test_api_get_device_info(
     assert await api.async_get_device_info() == MOCK_GET_DEVICE_INFO["data"]
 
 
+async def test_api_unchanged_response_is_reused(
+    hass,
+    aioclient_mock,
+):
+    """Test a repeated response body returns the previously parsed data."""
+    api = api_client(hass)
+
+    aioclient_mock.post(RPC_ENDPOINT, json=MOCK_GET_DEVICE_INFO)
+    first = await api.async_get_device_info()
+    second = await api.async_get_device_info()
+
+    assert aioclient_mock.call_count == 2
+    assert second is first
+
+
+async def test_api_concurrent_reads_share_request(
+    hass,
+    aioclient_mock,
+):
+    """Test concurrent identical reads are sent once and writes are not."""
+    api = api_client(hass)
+
+    aioclient_mock.post(RPC_ENDPOINT, json=MOCK_GET_DEVICE_INFO)
+    results = await asyncio.gather(
+        *(api.async_get_device_info() for _ in range(3)),
+        api.async_get_device_info(device_id=10),
+    )
+
+    assert aioclient_mock.call_count == 2
+    assert results[0] is results[1] is results[2]
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.post(RPC_ENDPOINT, json=MOCK_NO_ERR)
+    await asyncio.gather(
+        *(api.async_set_env_goal(obj_id=21, goal=24) for _ in range(2))
+    )
+
+    assert aioclient_mock.call_count == 2
+
+
+async def test_api_read_after_write_sends_new_request(hass):
+    """Test a read after a write does not join a read started before it."""
+    account = MhAccount()
+    session = GatedSession()
+    api = MhApiClient(
+        username="test_user",
+        api_key="test_api_key",
+        device_id=12,
+        session=session,
+        account=account,
+    )
+
+    stale = asyncio.ensure_future(api.async_get_device_info())
+    await asyncio.sleep(0)
+    await api.async_set_env_goal(obj_id=21, goal=22)
+    fresh = asyncio.ensure_future(api.async_get_device_info())
+    joined = asyncio.ensure_future(api.async_get_device_info())
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert session.calls == 3
+    assert session.peak == 2
+
+    session.release.set()
+    await asyncio.gather(stale, fresh, joined)
+    assert not account.inflight
+
+
+async def test_api_account_shares_devices_and_limits_requests(
+    hass,
+    aioclient_mock,
+):
+    """Test clients of one account share getDevices and the request limit."""
+    account = MhAccount(max_concurrent_requests=1)
+    first = api_client(hass, device_id=12, account=account)
+    second = api_client(hass, device_id=10, account=account)
+
+    aioclient_mock.post(RPC_ENDPOINT, json=MOCK_GET_DEVICES)
+    assert await first.async_get_devices() == MOCK_GET_DEVICES["data"]
+    assert await second.async_get_devices() is await first.async_get_devices()
+    assert aioclient_mock.call_count == 1
+
+    for limit in (1, 2):
+        account = MhAccount(max_concurrent_requests=limit)
+        session = GatedSession()
+        clients = [
+            MhApiClient(
+                username="test_user",
+                api_key="test_api_key",
+                device_id=device_id,
+                session=session,
+                account=account,
+            )
+            for device_id in (12, 10, 11)
+        ]
+        reads = asyncio.gather(*(client.async_get_device_info() for client in clients))
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert session.peak == limit
+        session.release.set()
+        await reads
+        assert session.calls == 3
+        assert session.peak == limit
+
+
 async def test_api_set(
     hass,
     aioclient_mock,
@@ -118,3 +275,20 @@ async def test_api_rpc_error_type_error(hass, aioclient_mock, caplog):
             len(caplog.record_tuples) == 1
             and "Error parsing information from" in caplog.record_tuples[0][2]
         )
+
+
+async def test_api_circuit_breaker_fails_fast(hass, aioclient_mock):
+    """Test the circuit opens after repeated failures and requests fail fast."""
+    api = api_client(hass)
+
+    aioclient_mock.post(RPC_ENDPOINT, exc=aiohttp.ClientError)
+    for _ in range(3):
+        with pytest.raises(aiohttp.ClientError):
+            await api.async_get_device_info()
+
+    assert api.breaker.state == BREAKER_OPEN
+    assert api.breaker.next_retry is not None
+
+    with pytest.raises(CircuitOpenError):
+        await api.async_get_device_info()
+    assert aioclient_mock.call_count == 3
@@ -0,0 +1,91 @@
+"""Tests for the cloud circuit breaker."""
+
+import time
+
+import pytest
+
+from custom_components.myheat.breaker import CircuitOpenError, MhCircuitBreaker
+from custom_components.myheat.const import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+)
+
+
+def test_breaker_opens_after_threshold():
+    breaker = MhCircuitBreaker(failure_threshold=2, base_backoff=60)
+    changes = []
+    breaker.add_listener(lambda: changes.append(breaker.state))
+
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_CLOSED
+
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_OPEN
+    assert changes == [BREAKER_OPEN]
+
+    with pytest.raises(CircuitOpenError) as err:
+        breaker.before_request()
+    assert err.value.next_retry == breaker.next_retry
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    breaker = MhCircuitBreaker(failure_threshold=1, base_backoff=0.02)
+
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.before_request() is True
+    assert breaker.state == BREAKER_HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.release(probe=True)
+    probe = breaker.before_request()
+    breaker.record_success(probe=probe)
+
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.failures == 0
+    assert breaker.next_retry is None
+    breaker.before_request()
+
+
+def test_breaker_backoff_grows_with_jitter():
+    breaker = MhCircuitBreaker(failure_threshold=1, base_backoff=10, max_backoff=40)
+    backoffs = []
+    breaker.record_failure()
+    for _ in range(4):
+        backoffs.append(
+            breaker._retry_at - time.monotonic()
+        )  # pylint: disable=protected-access
+        breaker._retry_at = 0  # pylint: disable=protected-access
+        breaker.record_failure(probe=breaker.before_request())
+
+    for backoff, limit in zip(backoffs, (10, 20, 40, 40)):
+        assert limit / 2 - 0.1 <= backoff <= limit
+
+
+def test_breaker_ignores_outcomes_of_requests_started_before_the_trip():
+    breaker = MhCircuitBreaker(failure_threshold=1, base_backoff=10)
+    for _ in range(2):
+        assert breaker.before_request() is False
+
+    breaker.record_failure()
+    retry_at = breaker._retry_at  # pylint: disable=protected-access
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.release()
+
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.failures == 1
+    assert breaker._retry_at == retry_at  # pylint: disable=protected-access
+
+    breaker._retry_at = 0  # pylint: disable=protected-access
+    probe = breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_HALF_OPEN
+
+    breaker.record_success(probe=probe)
+    assert breaker.state == BREAKER_CLOSED
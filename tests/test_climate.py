@@ -1,5 +1,6 @@
 """Test MyHeat climate entities."""
 
+from copy import deepcopy
 from unittest.mock import call, patch
 
 from homeassistant.components.climate import (
@@ -87,3 +88,23 @@ async def test_climate_services(hass, bypass_get_device_info):
             blocking=True,
         )
         assert mode_func.call_args == call(mode_id=1)
+
+
+async def test_climate_writes_state_only_on_change(hass, bypass_get_device_info):
+    """Test unchanged coordinator data does not produce state writes."""
+    entry = await setup_mock_entry(hass)
+    coordinator = entry.runtime_data
+
+    with patch(
+        "custom_components.myheat.climate.MhEnvClimate.async_write_ha_state"
+    ) as write_func:
+        coordinator.api._invalidate_cloud()  # pylint: disable=protected-access
+        coordinator.async_set_updated_data(deepcopy(coordinator.data))
+        assert not write_func.called
+
+        data = deepcopy(coordinator.data)
+        env = next(env for env in data["envs"] if env["id"] == 22)
+        env["target"] = 21.5
+        coordinator.api._invalidate_cloud()  # pylint: disable=protected-access
+        coordinator.async_set_updated_data(data)
+        assert write_func.call_count == 1
@@ -0,0 +1,55 @@
+"""Tests for the JSON codec used by the API clients."""
+
+import json
+import time
+
+import pytest
+
+from custom_components.myheat.codec import decode_json, encode_json
+
+from .const import (
+    MOCK_GET_DEVICE_INFO,
+    MOCK_GET_DEVICES,
+    MOCK_LOCAL_GET_STATE,
+    MOCK_LOCAL_OBJ_STATE,
+    MOCK_NO_ERR,
+)
+
+FIXTURES = [
+    MOCK_GET_DEVICE_INFO,
+    MOCK_GET_DEVICES,
+    MOCK_LOCAL_GET_STATE,
+    MOCK_LOCAL_OBJ_STATE,
+    MOCK_NO_ERR,
+]
+
+
+@pytest.mark.parametrize("fixture", FIXTURES)
+def test_codec_round_trip_matches_stdlib(fixture):
+    body = json.dumps(fixture).encode()
+
+    assert decode_json(body) == json.loads(body)
+    assert json.loads(encode_json(fixture)) == fixture
+    assert isinstance(encode_json(fixture), bytes)
+
+
+def test_codec_rejects_invalid_json():
+    with pytest.raises(ValueError):
+        decode_json(b"{not json")
+
+
+@pytest.mark.perf
+def test_codec_benchmark():
+    pytest.importorskip("orjson")
+    bodies = [json.dumps(fixture).encode() for fixture in FIXTURES]
+
+    def elapsed(loads, dumps):
+        started = time.perf_counter()
+        for _ in range(200):
+            for body in bodies:
+                dumps(loads(body))
+        return time.perf_counter() - started
+
+    codec = elapsed(decode_json, encode_json)
+    stdlib = elapsed(json.loads, lambda data: json.dumps(data).encode())
+    assert codec < stdlib
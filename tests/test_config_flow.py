@@ -8,6 +8,8 @@ import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.myheat.const import BINARY_SENSOR  # noqa: F401
+from custom_components.myheat.const import CONF_CLOUD_SUMMARY_POLLING
+from custom_components.myheat.const import CONF_LOCAL_FETCH_MODE
 from custom_components.myheat.const import CONF_LOCAL_HOST
 from custom_components.myheat.const import CONF_LOCAL_MODE_ENABLED
 from custom_components.myheat.const import CONF_LOCAL_PASSWORD
@@ -122,6 +124,8 @@ async def test_options_flow(hass):
         CONF_LOCAL_PASSWORD: "local_password",
         CONF_LOCAL_REQUEST_TIMEOUT: 15,
         CONF_LOCAL_POLL_INTERVAL: 10,
+        CONF_LOCAL_FETCH_MODE: "sequential",
+        CONF_CLOUD_SUMMARY_POLLING: True,
     }
     result = await hass.config_entries.options.async_configure(
         result["flow_id"],
@@ -0,0 +1,510 @@
+"""Tests for the hybrid cloud/local MY HEAT API client."""
+
+import asyncio
+from copy import deepcopy
+import time
+import tracemalloc
+
+import pytest
+
+from custom_components.myheat.const import (
+    LOCAL_FETCH_MODE_PARALLEL,
+    LOCAL_FETCH_MODE_SEQUENTIAL,
+)
+from custom_components.myheat.hybrid_api import (
+    MhHybridApiClient,
+    merge_local_device_info,
+    normalize_local_device_info,
+)
+
+from .const import MOCK_GET_DEVICE_INFO, MOCK_LOCAL_GET_STATE, MOCK_LOCAL_OBJ_STATE
+
+
+class FakeCloudClient:
+    """Cloud client returning recorded data after an injected delay."""
+
+    def __init__(self, *, latency=0.0, data=None):
+        self.latency = latency
+        self.data = deepcopy(MOCK_GET_DEVICE_INFO["data"]) if data is None else data
+        self.calls = 0
+        self.summary_calls = 0
+        self.writes = []
+        self.write_error = None
+
+    async def async_get_device_info(self, *, device_id=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self.data
+
+    async def async_set_env_goal(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        if self.write_error is not None:
+            raise self.write_error
+        self.writes.append(kwargs)
+
+    async def async_set_eng_goal(self, **kwargs):
+        self.writes.append(kwargs)
+
+    async def async_get_device_summary(self, *, device_id=None):
+        self.summary_calls += 1
+        await asyncio.sleep(self.latency)
+        return {"id": 12, "severity": self.data.get("severity")}
+
+
+class FakeLocalClient:
+    """Local client returning recorded data after an injected delay."""
+
+    authenticated = True
+
+    def __init__(self, *, latency=0.0, state_latency=0.0):
+        self.latency = latency
+        self.state_latency = state_latency
+        self.obj_state_calls = 0
+        self.state_calls = 0
+
+    async def async_get_obj_state(self):
+        self.obj_state_calls += 1
+        await asyncio.sleep(self.latency)
+        return deepcopy(MOCK_LOCAL_OBJ_STATE)
+
+    async def async_get_state(self):
+        self.state_calls += 1
+        await asyncio.sleep(self.state_latency)
+        return deepcopy(MOCK_LOCAL_GET_STATE)
+
+
+def hybrid_client(cloud, local, **kwargs) -> MhHybridApiClient:
+    return MhHybridApiClient(cloud_client=cloud, local_client=local, **kwargs)
+
+
+async def _timed_tick(client: MhHybridApiClient) -> tuple[float, dict]:
+    started = time.perf_counter()
+    data = await client.async_get_device_info()
+    return time.perf_counter() - started, data
+
+
+def _traced(events: list[str], name: str, fetch):
+    async def wrapper(*args, **kwargs):
+        events.append(f"{name} start")
+        try:
+            return await fetch(*args, **kwargs)
+        finally:
+            events.append(f"{name} end")
+
+    return wrapper
+
+
+async def test_hybrid_tick_fetches_sources_concurrently():
+    cloud = FakeCloudClient(latency=0.02)
+    local = FakeLocalClient(latency=0.01)
+    events = []
+    cloud.async_get_device_info = _traced(events, "cloud", cloud.async_get_device_info)
+    local.async_get_obj_state = _traced(events, "local", local.async_get_obj_state)
+    client = hybrid_client(cloud, local)
+
+    data = await client.async_get_device_info()
+
+    assert data["local"]["available"] is True
+    assert data["weatherTemp"] == MOCK_GET_DEVICE_INFO["data"]["weatherTemp"]
+    assert events.index("cloud start") < events.index("local end")
+    assert events.index("local start") < events.index("cloud end")
+
+
+@pytest.mark.perf
+async def test_hybrid_benchmark_tick_latency_tracks_max_of_sources():
+    cloud_latency = 0.2
+    local_latency = 0.1
+    client = hybrid_client(
+        FakeCloudClient(latency=cloud_latency),
+        FakeLocalClient(latency=local_latency),
+    )
+
+    elapsed, data = await _timed_tick(client)
+
+    assert data["local"]["available"] is True
+    assert data["weatherTemp"] == MOCK_GET_DEVICE_INFO["data"]["weatherTemp"]
+    assert cloud_latency <= elapsed < cloud_latency + local_latency
+
+
+async def test_hybrid_cloud_stall_does_not_delay_local_tick():
+    cloud = FakeCloudClient()
+    local = FakeLocalClient(latency=0.01)
+    client = hybrid_client(cloud, local, cloud_poll_interval=0, local_poll_interval=0)
+    landed = []
+    client.set_update_callback(lambda: landed.append(client.cached_device_info()))
+
+    await client.async_get_device_info()
+    cloud.latency = 0.5
+    cloud.data = {**cloud.data, "weatherTemp": 1.5}
+
+    data = await client.async_get_device_info()
+
+    assert not client._cloud_task.done()  # pylint: disable=protected-access
+    assert data["weatherTemp"] == MOCK_GET_DEVICE_INFO["data"]["weatherTemp"]
+    assert landed == []
+
+    await asyncio.sleep(cloud.latency)
+
+    assert len(landed) == 1
+    assert landed[0]["weatherTemp"] == 1.5
+    assert landed[0]["local"]["available"] is True
+
+
+async def test_hybrid_cloud_only_waits_for_cloud():
+    cloud = FakeCloudClient(latency=0.05)
+    client = hybrid_client(cloud, None, cloud_poll_interval=0)
+
+    await client.async_get_device_info()
+    data = await client.async_get_device_info()
+
+    assert cloud.calls == 2
+    assert data == MOCK_GET_DEVICE_INFO["data"]
+
+
+async def test_hybrid_shutdown_cancels_pending_cloud_fetch():
+    cloud = FakeCloudClient()
+    client = hybrid_client(cloud, FakeLocalClient(), cloud_poll_interval=0)
+
+    await client.async_get_device_info()
+    cloud.latency = 10
+    await client.async_get_device_info()
+    task = client._cloud_task  # pylint: disable=protected-access
+
+    client.shutdown()
+    await asyncio.sleep(0)
+
+    assert task.cancelled()
+
+
+async def test_hybrid_write_cancels_pending_cloud_fetch():
+    cloud = FakeCloudClient()
+    client = hybrid_client(cloud, None, cloud_poll_interval=0, write_coalesce_window=0)
+
+    await client.async_get_device_info()
+    cloud.latency = 10
+    stale = asyncio.ensure_future(client.async_get_device_info())
+    for _ in range(2):
+        await asyncio.sleep(0)
+    task = client._cloud_task  # pylint: disable=protected-access
+    assert cloud.calls == 2
+
+    cloud.latency = 0
+    cloud.data = {**cloud.data, "weatherTemp": 1.5}
+    await client.async_set_env_goal(obj_id=21, goal=22)
+    await asyncio.sleep(0)
+
+    assert task.cancelled()
+    # the poll waiting for the cancelled fetch reads the device again
+    data = await stale
+    assert cloud.calls == 3
+    assert data["weatherTemp"] == 1.5
+
+
+async def test_hybrid_local_fetch_modes():
+    overlapped = {}
+    for mode in (LOCAL_FETCH_MODE_PARALLEL, LOCAL_FETCH_MODE_SEQUENTIAL):
+        local = FakeLocalClient(latency=0.01, state_latency=0.01)
+        events = []
+        local.async_get_obj_state = _traced(events, "obj", local.async_get_obj_state)
+        local.async_get_state = _traced(events, "state", local.async_get_state)
+        client = hybrid_client(FakeCloudClient(), local, local_fetch_mode=mode)
+
+        data = await client.async_get_device_info()
+
+        assert data["local"]["gsmBalance"] == 137.7
+        assert len(events) == 4
+        overlapped[mode] = events[1].endswith("start")
+
+    assert overlapped == {
+        LOCAL_FETCH_MODE_PARALLEL: True,
+        LOCAL_FETCH_MODE_SEQUENTIAL: False,
+    }
+
+
+@pytest.mark.perf
+async def test_hybrid_benchmark_local_fetch_modes():
+    rtt = 0.1
+    durations = {}
+    for mode in (LOCAL_FETCH_MODE_PARALLEL, LOCAL_FETCH_MODE_SEQUENTIAL):
+        local = FakeLocalClient(latency=rtt, state_latency=rtt)
+        client = hybrid_client(FakeCloudClient(), local, local_fetch_mode=mode)
+
+        data = await client.async_get_device_info()
+
+        assert data["local"]["gsmBalance"] == 137.7
+        assert local.obj_state_calls == local.state_calls == 1
+        durations[mode] = client.local_fetch_duration
+
+    assert rtt <= durations[LOCAL_FETCH_MODE_PARALLEL] < 2 * rtt
+    assert durations[LOCAL_FETCH_MODE_SEQUENTIAL] >= 2 * rtt
+
+
+async def test_hybrid_device_state_polled_on_slower_cadence():
+    local = FakeLocalClient()
+    client = hybrid_client(
+        FakeCloudClient(),
+        local,
+        local_poll_interval=0,
+        local_state_poll_interval=600,
+    )
+
+    await client.async_get_device_info()
+    data = await client.async_get_device_info()
+
+    assert local.obj_state_calls == 2
+    assert local.state_calls == 1
+    assert data["local"]["gsmBalance"] == 137.7
+
+
+async def test_hybrid_summary_polling_defers_full_device_info():
+    cloud = FakeCloudClient()
+    client = hybrid_client(
+        cloud, None, cloud_poll_interval=0, cloud_full_poll_interval=300
+    )
+
+    first = await client.async_get_device_info()
+    for _ in range(3):
+        assert await client.async_get_device_info() is first
+
+    assert cloud.calls == 1
+    assert cloud.summary_calls == 3
+
+    cloud.data = {**cloud.data, "severity": 32}
+    data = await client.async_get_device_info()
+
+    assert cloud.calls == 2
+    assert data["severity"] == 32
+
+    client._cloud_full_poll_interval = 0  # pylint: disable=protected-access
+    await client.async_get_device_info()
+
+    assert cloud.calls == 3
+    assert cloud.summary_calls == 4
+
+
+async def test_hybrid_env_goal_writes_are_coalesced():
+    cloud = FakeCloudClient()
+    client = hybrid_client(cloud, None, write_coalesce_window=0.05)
+
+    results = await asyncio.gather(
+        *(client.async_set_env_goal(obj_id=21, goal=goal) for goal in (20, 21, 22)),
+        client.async_set_env_goal(obj_id=22, goal=18),
+    )
+
+    assert results == [None] * 4
+    assert cloud.writes == [
+        {"obj_id": 21, "goal": 22},
+        {"obj_id": 22, "goal": 18},
+    ]
+
+    cloud.write_error = RuntimeError("write failed")
+    results = await asyncio.gather(
+        *(client.async_set_env_goal(obj_id=21, goal=goal) for goal in (23, 24)),
+        return_exceptions=True,
+    )
+
+    assert results == [cloud.write_error] * 2
+    assert len(cloud.writes) == 2
+
+
+async def test_hybrid_env_goal_writes_keep_order():
+    cloud = FakeCloudClient(latency=0.05)
+    client = hybrid_client(cloud, None, write_coalesce_window=0.01)
+
+    first = asyncio.create_task(client.async_set_env_goal(obj_id=21, goal=20))
+    await asyncio.sleep(0.03)
+    # the first write is in flight, this one waits for it
+    await client.async_set_env_goal(obj_id=21, goal=25)
+    await first
+
+    assert [write["goal"] for write in cloud.writes] == [20, 25]
+
+
+async def test_hybrid_noop_writes_are_suppressed():
+    cloud = FakeCloudClient()
+    client = hybrid_client(cloud, None, write_coalesce_window=0)
+    await client.async_get_device_info()
+
+    await client.async_set_env_goal(obj_id=21, goal=45)
+    await client.async_set_eng_goal(obj_id=302, goal=-1)
+    assert cloud.writes == []
+
+    await client.async_set_env_goal(obj_id=21, goal=45, force=True)
+    assert cloud.writes == [{"obj_id": 21, "goal": 45}]
+
+    # the write invalidated the snapshot, so nothing is known to be set
+    await client.async_set_env_goal(obj_id=21, goal=45)
+    await client.async_set_eng_goal(obj_id=302, goal=1)
+    assert len(cloud.writes) == 3
+
+    await client.async_get_device_info()
+    await client.async_set_env_goal(obj_id=21, goal=44)
+    await client.async_set_env_goal(obj_id=21, goal=45, change_mode=True)
+    assert len(cloud.writes) == 5
+
+
+def _deepcopy_merge(cloud_data, local_data):
+    """Reference merge that copies every input, as the client used to do."""
+    if cloud_data is None:
+        return deepcopy(local_data or {})
+    if local_data is None:
+        return deepcopy(cloud_data)
+
+    result = deepcopy(cloud_data)
+    for key in ("heaters", "envs", "engs", "alarms"):
+        items = result.get(key, [])
+        by_id = {item["id"]: item for item in items}
+        for local_item in local_data.get(key, []):
+            if local_item["id"] not in by_id:
+                items.append(deepcopy(local_item))
+                continue
+            merged = by_id[local_item["id"]]
+            for k, v in local_item.items():
+                if k in ("local", "localControl", "minTemp", "maxTemp"):
+                    merged[k] = deepcopy(v)
+                elif k not in merged or merged[k] is None:
+                    merged[k] = deepcopy(v)
+        result[key] = items
+
+    result["local"] = deepcopy(local_data.get("local", {}))
+    if result.get("severity") is None:
+        result["severity"] = local_data.get("severity")
+        result["severityDesc"] = local_data.get("severityDesc")
+    result.setdefault("dataActual", local_data.get("dataActual", True))
+    return result
+
+
+def _large_controller(count):
+    obj_state = deepcopy(MOCK_LOCAL_OBJ_STATE)
+    env, eng = obj_state["envs"][0], obj_state["engs"][0]
+    obj_state["envs"] = [{**deepcopy(env), "i": 1000 + i} for i in range(count)]
+    obj_state["engs"] = [{**deepcopy(eng), "i": 5000 + i} for i in range(count)]
+    local_data = normalize_local_device_info(obj_state, MOCK_LOCAL_GET_STATE)
+
+    cloud_data = deepcopy(MOCK_GET_DEVICE_INFO["data"])
+    cloud_env, cloud_eng = cloud_data["envs"][0], cloud_data["engs"][0]
+    # every other local object is also known to the cloud
+    cloud_data["envs"] = [
+        {**cloud_env, "id": 1000 + i, "target": None} for i in range(0, count, 2)
+    ]
+    cloud_data["engs"] = [{**cloud_eng, "id": 5000 + i} for i in range(0, count, 2)]
+    return cloud_data, local_data
+
+
+def test_merge_matches_deepcopy_merge():
+    cloud_data, local_data = _large_controller(20)
+    cases = [
+        (cloud_data, local_data),
+        (cloud_data, None),
+        (None, local_data),
+        (None, None),
+        (
+            MOCK_GET_DEVICE_INFO["data"],
+            normalize_local_device_info(MOCK_LOCAL_OBJ_STATE),
+        ),
+    ]
+
+    for cloud, local in cases:
+        pristine = deepcopy((cloud, local))
+        assert merge_local_device_info(cloud, local) == _deepcopy_merge(cloud, local)
+        assert (cloud, local) == pristine
+
+
+def test_merge_allocations_on_large_controller():
+    cloud_data, local_data = _large_controller(400)
+
+    def peak_allocation(merge):
+        tracemalloc.start()
+        merge(cloud_data, local_data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    assert peak_allocation(merge_local_device_info) * 10 < peak_allocation(
+        _deepcopy_merge
+    )
+
+    merged = merge_local_device_info(cloud_data, local_data)
+    assert merged["local"] is local_data["local"]
+    assert merged["envs"][-1] is local_data["envs"][-1]
+
+
+@pytest.mark.perf
+def test_merge_benchmark_on_large_controller():
+    cloud_data, local_data = _large_controller(400)
+
+    def elapsed(merge):
+        started = time.perf_counter()
+        merge(cloud_data, local_data)
+        return time.perf_counter() - started
+
+    assert elapsed(merge_local_device_info) < elapsed(_deepcopy_merge)
+
+
+async def test_hybrid_merge_memoized_by_source_versions():
+    cloud = FakeCloudClient()
+    client = hybrid_client(cloud, FakeLocalClient(), local_poll_interval=0)
+
+    first = await client.async_get_device_info()
+    second = await client.async_get_device_info()
+
+    assert cloud.calls == 1
+    assert second == first
+    assert second is not first
+
+    client._local_poll_interval = 10  # pylint: disable=protected-access
+    third = await client.async_get_device_info()
+
+    assert third is second
+
+
+def test_normalize_keeps_unchanged_collections():
+    first = normalize_local_device_info(deepcopy(MOCK_LOCAL_OBJ_STATE))
+    obj_state = deepcopy(MOCK_LOCAL_OBJ_STATE)
+    obj_state["envs"][0]["st"]["p1"] = 22.6
+
+    second = normalize_local_device_info(obj_state, None, first)
+
+    assert second == normalize_local_device_info(obj_state)
+    assert second["heaters"] is first["heaters"]
+    assert second["engs"] is first["engs"]
+    assert second["envs"] is not first["envs"]
+    assert second["local"]["objectState"]["heaters"] is (
+        first["local"]["objectState"]["heaters"]
+    )
+
+
+async def test_hybrid_local_change_reuses_unchanged_merged_collections():
+    obj_state = deepcopy(MOCK_LOCAL_OBJ_STATE)
+    local = FakeLocalClient()
+    local.async_get_obj_state = lambda: _resolved(deepcopy(obj_state))
+    cloud = FakeCloudClient()
+    client = hybrid_client(cloud, local, local_poll_interval=0)
+
+    first = await client.async_get_device_info()
+    obj_state["envs"][0]["st"]["p1"] = 22.6
+    second = await client.async_get_device_info()
+
+    assert cloud.calls == 1
+    assert second is not first
+    assert second["heaters"] is first["heaters"]
+    assert second["engs"] is first["engs"]
+    assert second["envs"] is not first["envs"]
+
+
+async def test_hybrid_unchanged_sources_keep_snapshot():
+    obj_state = deepcopy(MOCK_LOCAL_OBJ_STATE)
+    local = FakeLocalClient()
+    local.async_get_obj_state = lambda: _resolved(obj_state)
+    client = hybrid_client(FakeCloudClient(), local, local_poll_interval=0)
+
+    first = await client.async_get_device_info()
+    versions = client.source_versions()
+    second = await client.async_get_device_info()
+
+    assert second is first
+    assert client.source_versions() == versions
+
+
+async def _resolved(value):
+    return value
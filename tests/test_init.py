@@ -1,11 +1,34 @@
 """Test MyHeat setup process."""
 
+from datetime import timedelta
+import hashlib
+from unittest.mock import MagicMock, patch
+
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.config_entries import ConfigEntryState
+from homeassistant.util import dt as dt_util
 import pytest
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
 
 from custom_components.myheat import MhDataUpdateCoordinator
-from custom_components.myheat.const import DOMAIN
+from custom_components.myheat.account import DATA_ACCOUNTS
+from custom_components.myheat.const import (
+    CONF_LOCAL_HOST,
+    CONF_LOCAL_MODE_ENABLED,
+    CONF_LOCAL_PASSWORD,
+    CONF_LOCAL_USERNAME,
+    DOMAIN,
+    LOCAL_SESSION_STORAGE_KEY,
+    LOCAL_SESSION_STORAGE_VERSION,
+    SOURCE_CLOUD,
+    SOURCE_LOCAL,
+)
+from custom_components.myheat.coordinator import _build_index
+from custom_components.myheat.local_api import LocalResponseError
+from custom_components.myheat.scheduler import async_get_scheduler
 
 from .const import MOCK_CONFIG
 
@@ -26,3 +49,163 @@ async def test_setup_entry_exception(hass, error_on_get_data):
     entry.add_to_hass(hass)
     assert await hass.config_entries.async_setup(entry.entry_id) is False
     assert entry.state is ConfigEntryState.SETUP_RETRY
+
+    # a failed setup does not keep its poll slot or the shared account
+    assert async_get_scheduler(hass).entries == 0
+    assert not hass.data[DOMAIN][DATA_ACCOUNTS]
+
+
+async def test_staggered_entry_refreshes_after_setup(hass, bypass_get_device_info):
+    """Test a staggered first refresh does not hold up the entry setup."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.myheat.scheduler.MhPollScheduler.first_refresh_delay",
+        return_value=3.0,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert entry.runtime_data.data is None
+    assert hass.states.async_entity_ids(SENSOR_DOMAIN) == []
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3))
+    await hass.async_block_till_done()
+
+    assert entry.runtime_data.data is not None
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 15
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    assert async_get_scheduler(hass).entries == 0
+
+
+@pytest.mark.parametrize(
+    ("username", "password", "restored"),
+    [
+        ("myheat", "myheat", "stored-session"),
+        ("other", "myheat", None),
+        ("myheat", "changed", None),
+    ],
+)
+async def test_local_session_restored_for_same_login(
+    hass, hass_storage, bypass_get_device_info, username, password, restored
+):
+    """Test a stored local session is dropped when the login changed."""
+    key = f"{LOCAL_SESSION_STORAGE_KEY}.test"
+    hass_storage[key] = {
+        "version": LOCAL_SESSION_STORAGE_VERSION,
+        "minor_version": 1,
+        "key": key,
+        "data": {
+            "host": "192.0.2.10",
+            "username": "myheat",
+            "password_digest": hashlib.sha256(b"myheat").hexdigest(),
+            "session_id": "stored-session",
+        },
+    }
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            **MOCK_CONFIG,
+            CONF_LOCAL_MODE_ENABLED: True,
+            CONF_LOCAL_HOST: "192.0.2.10",
+            CONF_LOCAL_USERNAME: username,
+            CONF_LOCAL_PASSWORD: password,
+        },
+        entry_id="test",
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.myheat.LocalApiClient.async_get_obj_state",
+        side_effect=LocalResponseError,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id) is True
+
+    local = entry.runtime_data.api.local
+    assert local._session_id == restored  # pylint: disable=protected-access
+
+
+async def test_coordinator_notifies_listeners_of_changed_sources(
+    hass, bypass_get_device_info
+):
+    """Test listeners are only woken up by the sources they read."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id) is True
+    coordinator = entry.runtime_data
+
+    calls = []
+    coordinator.async_add_listener(lambda: calls.append(SOURCE_CLOUD), {SOURCE_CLOUD})
+    coordinator.async_add_listener(lambda: calls.append(SOURCE_LOCAL), {SOURCE_LOCAL})
+    coordinator.async_update_listeners()
+    calls.clear()
+
+    coordinator.async_update_listeners()
+    assert calls == []
+
+    coordinator.api._invalidate_local()  # pylint: disable=protected-access
+    coordinator.async_update_listeners()
+    assert calls == [SOURCE_LOCAL]
+
+
+async def test_coordinator_background_update_keeps_poll_schedule(
+    hass, bypass_get_device_info
+):
+    """Test a late cloud result is published without moving the next poll."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id) is True
+    coordinator = entry.runtime_data
+
+    calls = []
+    coordinator.async_add_listener(lambda: calls.append(SOURCE_CLOUD), {SOURCE_CLOUD})
+    next_refresh = coordinator._unsub_refresh  # pylint: disable=protected-access
+    interval = coordinator.update_interval
+    landed = {**coordinator.data, "weatherTemp": 1.5}
+
+    with (
+        patch.object(coordinator.api, "cached_device_info", return_value=landed),
+        patch.object(
+            coordinator.api, "source_versions", return_value={SOURCE_CLOUD: -1}
+        ),
+        patch.object(coordinator, "_schedule_refresh") as schedule_refresh,
+    ):
+        coordinator._handle_source_update()  # pylint: disable=protected-access
+
+    assert coordinator.data is landed
+    assert calls == [SOURCE_CLOUD]
+    schedule_refresh.assert_not_called()
+    assert (
+        coordinator._unsub_refresh is next_refresh
+    )  # pylint: disable=protected-access
+    assert coordinator.update_interval == interval
+
+
+async def test_coordinator_object_index(hass):
+    """Test object lookups use an index built once per data snapshot."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    coordinator = MhDataUpdateCoordinator(hass, entry=entry, client=MagicMock())
+
+    data = {
+        collection: [{"id": obj_id, "name": f"{obj_id}"} for obj_id in range(200)]
+        for collection in ("heaters", "envs", "engs", "alarms")
+    }
+    coordinator.data = data
+
+    with patch(
+        "custom_components.myheat.coordinator._build_index", wraps=_build_index
+    ) as build_index:
+        for collection, items in data.items():
+            for obj_id in range(200):
+                assert coordinator.get_object(collection, obj_id) is items[obj_id]
+        assert coordinator.get_object("envs", 200) == {}
+        assert coordinator.get_object("unknown", 1) == {}
+        assert build_index.call_count == 1
+
+        coordinator.data = {"envs": [{"id": 7}]}
+        assert coordinator.get_object("envs", 7) == {"id": 7}
+        assert coordinator.get_object("envs", 199) == {}
+        assert build_index.call_count == 2
@@ -1,6 +1,8 @@
 """Tests for the local MY HEAT UI API client."""
 
+import asyncio
 from copy import deepcopy
+import json
 
 import pytest
 
@@ -12,6 +14,10 @@ from custom_components.myheat.local_api import (
     LocalResponseError,
     LocalVerificationError,
 )
+from custom_components.myheat.local_queue import (
+    LocalConcurrencyLimit,
+    LocalRequestQueue,
+)
 
 from .const import MOCK_LOCAL_GET_STATE, MOCK_LOCAL_OBJ_STATE
 
@@ -32,8 +38,8 @@ class FakeResponse:
         self.status = status
         self.headers = FakeHeaders(headers or {})
 
-    async def json(self, *, content_type=None):  # pylint: disable=unused-argument
-        return self._payload
+    async def read(self):
+        return json.dumps(self._payload).encode()
 
 
 class FakeSession:
@@ -41,12 +47,12 @@ class FakeSession:
         self.responses = list(responses)
         self.requests = []
 
-    async def post(self, url, *, headers, json):
+    async def post(self, url, *, headers, data):
         self.requests.append(
             {
                 "url": url,
                 "headers": headers,
-                "json": json,
+                "json": json.loads(data),
             }
         )
         response = self.responses.pop(0)
@@ -55,12 +61,20 @@ class FakeSession:
         return response
 
 
-def local_client(session) -> LocalApiClient:
+def local_client(session, **kwargs) -> LocalApiClient:
     return LocalApiClient(
         host="192.0.2.10",
         username="myheat",
         password="myheat",
         session=session,
+        **kwargs,
+    )
+
+
+def _login_response(session_id):
+    return FakeResponse(
+        {"status": True},
+        headers={"Set-Cookie": f"EspSessId={session_id}; Max-Age=86400; Path=/;"},
     )
 
 
@@ -84,6 +98,34 @@ async def test_local_login_stores_cookie_and_sends_it():
     assert session.requests[1]["headers"]["Cookie"] == "EspSessId=session-id"
 
 
+async def test_local_restored_session_skips_login_and_reports_new_one():
+    session = FakeSession(
+        [
+            FakeResponse(MOCK_LOCAL_OBJ_STATE),
+            FakeResponse({}, status=401),
+            _login_response("new-session"),
+            FakeResponse(MOCK_LOCAL_GET_STATE),
+        ]
+    )
+    saved = []
+    client = LocalApiClient(
+        host="192.0.2.10",
+        username="myheat",
+        password="myheat",
+        session=session,
+        session_id="stored-session",
+        session_callback=saved.append,
+    )
+
+    assert client.authenticated
+    await client.async_get_obj_state()
+    assert session.requests[0]["headers"]["Cookie"] == "EspSessId=stored-session"
+    assert saved == []
+
+    await client.async_get_state()
+    assert saved == ["new-session"]
+
+
 async def test_local_failed_login_raises_auth_error():
     session = FakeSession([FakeResponse({"status": False})])
     client = local_client(session)
@@ -92,6 +134,77 @@ async def test_local_failed_login_raises_auth_error():
         await client.async_login()
 
 
+async def test_local_expired_session_logs_in_again_and_retries():
+    session = FakeSession(
+        [
+            FakeResponse({}, status=401),
+            _login_response("new-session"),
+            FakeResponse(MOCK_LOCAL_OBJ_STATE),
+        ]
+    )
+    client = local_client(session)
+    client._session_id = "old-session"  # pylint: disable=protected-access
+
+    assert await client.async_get_obj_state() == MOCK_LOCAL_OBJ_STATE
+
+    assert [request["url"].partition("/api")[2] for request in session.requests] == [
+        "/getObjState",
+        "/login",
+        "/getObjState",
+    ]
+    assert session.requests[2]["headers"]["Cookie"] == "EspSessId=new-session"
+
+
+async def test_local_server_error_lowers_concurrency_limit():
+    limit = LocalConcurrencyLimit(max_limit=4)
+    for _ in range(13):
+        limit.record(started_at=0, latency=0.1, error=False, saturated=True)
+    assert limit.value == 4
+
+    session = FakeSession([FakeResponse({}, status=503)])
+    client = local_client(session, queue=LocalRequestQueue(limit=limit))
+    client._session_id = "session"  # pylint: disable=protected-access
+
+    with pytest.raises(LocalResponseError):
+        await client.async_get_obj_state()
+
+    assert limit.value == 2
+
+
+async def test_local_rejected_new_session_raises_auth_error():
+    session = FakeSession(
+        [
+            FakeResponse({}, status=401),
+            _login_response("new-session"),
+            FakeResponse({}, status=403),
+        ]
+    )
+    client = local_client(session)
+    client._session_id = "old-session"  # pylint: disable=protected-access
+
+    with pytest.raises(LocalAuthError):
+        await client.async_get_obj_state()
+
+
+async def test_local_concurrent_requests_share_login():
+    session = FakeSession(
+        [
+            _login_response("session-id"),
+            FakeResponse(MOCK_LOCAL_OBJ_STATE),
+            FakeResponse(MOCK_LOCAL_GET_STATE),
+        ]
+    )
+    client = local_client(session)
+
+    await asyncio.gather(client.async_get_obj_state(), client.async_get_state())
+
+    assert [request["url"].endswith("/api/login") for request in session.requests] == [
+        True,
+        False,
+        False,
+    ]
+
+
 async def test_normalize_local_device_info_maps_objects_and_sanitizes_regkey():
     data = normalize_local_device_info(MOCK_LOCAL_OBJ_STATE, MOCK_LOCAL_GET_STATE)
 
@@ -265,9 +378,10 @@ async def test_local_write_verification_mismatch_raises():
         [
             FakeResponse({"status": 1}),
             FakeResponse(MOCK_LOCAL_OBJ_STATE),
+            FakeResponse(MOCK_LOCAL_OBJ_STATE),
         ]
     )
-    client = local_client(session)
+    client = local_client(session, verify_schedule=(0, 0.01))
     client._session_id = "session-id"  # pylint: disable=protected-access
     client._obj_state = deepcopy(
         MOCK_LOCAL_OBJ_STATE
@@ -275,3 +389,109 @@ async def test_local_write_verification_mismatch_raises():
 
     with pytest.raises(LocalVerificationError):
         await client.async_set_heater_enabled(obj_id=45, enabled=False)
+
+    assert len(session.requests) == 3
+    assert client.verification.failures == 1
+    assert client.verification.average_attempts is None
+
+
+async def test_local_write_verification_retries_until_applied():
+    applied = deepcopy(MOCK_LOCAL_OBJ_STATE)
+    applied["heaters"][0]["s"]["p3013"] = 1
+    session = FakeSession(
+        [
+            FakeResponse({"status": 1}),
+            FakeResponse(MOCK_LOCAL_OBJ_STATE),
+            FakeResponse(applied),
+        ]
+    )
+    client = local_client(session, verify_schedule=(0, 0.01, 0.02))
+    client._session_id = "session-id"  # pylint: disable=protected-access
+    client._obj_state = deepcopy(
+        MOCK_LOCAL_OBJ_STATE
+    )  # pylint: disable=protected-access
+    results = []
+    client.verification.add_listener(
+        lambda: results.append(client.verification.last_attempts)
+    )
+
+    await client.async_set_heater_enabled(obj_id=45, enabled=False)
+
+    assert len(session.requests) == 3
+    assert results == [2]
+    assert client.verification.attempts == {2: 1}
+    assert client.verification.average_attempts == 2
+
+
+async def test_local_write_verification_skips_failed_reads():
+    applied = deepcopy(MOCK_LOCAL_OBJ_STATE)
+    applied["heaters"][0]["s"]["p3013"] = 1
+    session = FakeSession(
+        [
+            FakeResponse({"status": 1}),
+            FakeResponse({}, status=503),
+            FakeResponse(applied),
+            FakeResponse({"status": 1}),
+            FakeResponse({}, status=503),
+            FakeResponse({}, status=503),
+        ]
+    )
+    client = local_client(session, verify_schedule=(0, 0.01))
+    client._session_id = "session-id"  # pylint: disable=protected-access
+    client._obj_state = deepcopy(
+        MOCK_LOCAL_OBJ_STATE
+    )  # pylint: disable=protected-access
+
+    await client.async_set_heater_enabled(obj_id=45, enabled=False)
+    assert client.verification.attempts == {2: 1}
+
+    # only the last read failing fails the verification
+    with pytest.raises(LocalVerificationError) as excinfo:
+        await client.async_set_heater_enabled(obj_id=45, enabled=True)
+
+    assert isinstance(excinfo.value.__cause__, LocalResponseError)
+    assert len(session.requests) == 6
+    assert client.verification.failures == 1
+
+
+async def test_local_object_index_follows_stored_obj_state():
+    updated_state = deepcopy(MOCK_LOCAL_OBJ_STATE)
+    updated_state["envs"] = updated_state["envs"][1:]
+    session = FakeSession([FakeResponse(updated_state)])
+    client = local_client(session)
+    client._session_id = "session-id"  # pylint: disable=protected-access
+    client._obj_state = deepcopy(
+        MOCK_LOCAL_OBJ_STATE
+    )  # pylint: disable=protected-access
+
+    assert client.has_env(67)
+    assert client.has_heater(45)
+    assert client.has_curve(1)
+    assert not client.has_eng(67)
+
+    await client.async_get_obj_state()
+
+    assert not client.has_env(67)
+    assert client.has_heater(45)
+
+
+async def test_local_unchanged_obj_state_is_reused():
+    changed_state = deepcopy(MOCK_LOCAL_OBJ_STATE)
+    changed_state["envs"][0]["st"]["p1"] = 22.6
+    session = FakeSession(
+        [
+            FakeResponse(MOCK_LOCAL_OBJ_STATE),
+            FakeResponse(MOCK_LOCAL_OBJ_STATE),
+            FakeResponse(changed_state),
+        ]
+    )
+    client = local_client(session)
+    client._session_id = "session-id"  # pylint: disable=protected-access
+
+    first = await client.async_get_obj_state()
+    second = await client.async_get_obj_state()
+    third = await client.async_get_obj_state()
+
+    assert second is first
+    assert third is not first
+    assert third["envs"][0]["st"]["p1"] == 22.6
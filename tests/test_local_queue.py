@@ -0,0 +1,237 @@
+"""Tests for the local API request queue."""
+
+import asyncio
+import math
+import time
+
+import pytest
+
+from custom_components.myheat import local_queue
+from custom_components.myheat.local_queue import (
+    PRIORITY_LOGIN,
+    PRIORITY_POLL,
+    PRIORITY_WRITE,
+    LocalConcurrencyLimit,
+    LocalRequestQueue,
+    async_get_local_queue,
+)
+
+
+def fixed_queue(limit: int) -> LocalRequestQueue:
+    return LocalRequestQueue(
+        limit=LocalConcurrencyLimit(min_limit=limit, max_limit=limit)
+    )
+
+
+async def test_local_queue_runs_waiting_requests_by_priority():
+    queue = fixed_queue(1)
+    gate = asyncio.Event()
+    order = []
+
+    async def request(name):
+        if name == "first":
+            await gate.wait()
+        order.append(name)
+        return name
+
+    first = asyncio.create_task(queue.run(lambda: request("first"), priority=2))
+    await asyncio.sleep(0)
+
+    waiting = [
+        asyncio.create_task(queue.run(lambda n=name: request(n), priority=priority))
+        for name, priority in (
+            ("poll", PRIORITY_POLL),
+            ("write", PRIORITY_WRITE),
+            ("login", PRIORITY_LOGIN),
+        )
+    ]
+    await asyncio.sleep(0)
+    assert queue.depth == 3
+
+    gate.set()
+    await asyncio.gather(first, *waiting)
+
+    assert order == ["first", "login", "write", "poll"]
+    assert queue.depth == 0
+
+
+async def test_local_queue_shares_queued_polls():
+    queue = fixed_queue(1)
+    gate = asyncio.Event()
+    calls = []
+
+    async def request(name):
+        calls.append(name)
+        if name == "write":
+            await gate.wait()
+        return name
+
+    write = asyncio.create_task(
+        queue.run(lambda: request("write"), priority=PRIORITY_WRITE)
+    )
+    await asyncio.sleep(0)
+
+    polls = [
+        asyncio.create_task(
+            queue.run(lambda n=n: request(n), priority=PRIORITY_POLL, key="/api")
+        )
+        for n in ("poll1", "poll2")
+    ]
+    # the shared poll task gets its own turn before it queues
+    await asyncio.sleep(0.001)
+    assert queue.depth == 1
+
+    gate.set()
+    assert await asyncio.gather(write, *polls) == ["write", "poll1", "poll1"]
+    assert calls == ["write", "poll1"]
+
+    # a poll that already started is not shared with later ones
+    assert (
+        await queue.run(lambda: request("poll3"), priority=PRIORITY_POLL, key="/api")
+        == "poll3"
+    )
+
+
+async def test_local_queue_caps_concurrency_and_tracks_wait():
+    queue = fixed_queue(2)
+    active = 0
+    peak = 0
+    depths = []
+    queue.add_listener(lambda: depths.append(queue.depth))
+
+    async def request():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    await asyncio.gather(
+        *(queue.run(request, priority=PRIORITY_WRITE) for _ in range(5))
+    )
+
+    assert peak == 2
+    assert max(depths) == 3
+    assert queue.depth == 0
+    assert queue.last_wait > 0
+    assert 0 < queue.average_wait < queue.last_wait
+
+
+async def test_local_queue_cancelled_waiter_leaves_queue():
+    queue = fixed_queue(1)
+    gate = asyncio.Event()
+
+    running = asyncio.create_task(queue.run(gate.wait, priority=PRIORITY_WRITE))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(queue.run(gate.wait, priority=PRIORITY_WRITE))
+    await asyncio.sleep(0)
+    assert queue.depth == 1
+
+    waiting.cancel()
+    await asyncio.sleep(0)
+    assert queue.depth == 0
+
+    gate.set()
+    await running
+    assert await queue.run(lambda: asyncio.sleep(0, "ok"), priority=1) == "ok"
+
+
+def test_concurrency_limit_grows_under_load_and_halves_on_errors():
+    limit = LocalConcurrencyLimit(max_limit=4)
+    assert limit.value == 1
+
+    limit.record(started_at=0, latency=0.1, error=False, saturated=False)
+    assert limit.value == 1
+
+    # one step per limit-many requests: 1 -> 2 -> 2.5 -> 2.9
+    for _ in range(3):
+        limit.record(started_at=0, latency=0.1, error=False, saturated=True)
+    assert limit.value == 2
+
+    for _ in range(10):
+        limit.record(started_at=0, latency=0.1, error=False, saturated=True)
+    assert limit.value == 4
+
+    decreased = time.monotonic()
+    limit.record(started_at=decreased, latency=1.0, error=True, saturated=True)
+    assert limit.value == 2
+    assert limit.baseline() == 0.1
+
+    # requests started before the decrease do not halve it again
+    limit.record(started_at=decreased, latency=1.0, error=True, saturated=True)
+    assert limit.value == 2
+
+
+def test_concurrency_limit_halves_on_slow_responses():
+    limit = LocalConcurrencyLimit(min_limit=2, max_limit=4)
+    for _ in range(4):
+        limit.record(started_at=0, latency=0.1, error=False, saturated=True)
+    assert limit.value == 3
+
+    limit.record(started_at=time.monotonic(), latency=0.3, error=False, saturated=True)
+    assert limit.value == 2
+    assert 0.1 < limit.baseline() < 0.3
+
+
+def test_concurrency_limit_judges_latency_per_key():
+    limit = LocalConcurrencyLimit(min_limit=2, max_limit=4)
+    for _ in range(4):
+        limit.record(
+            started_at=0, latency=0.05, error=False, saturated=True, key="/login"
+        )
+    assert limit.value == 3
+
+    # a slower endpoint is not congestion of the faster one
+    for _ in range(3):
+        limit.record(
+            started_at=0, latency=0.5, error=False, saturated=True, key="/state"
+        )
+    assert limit.value == 4
+    assert limit.baseline("/login") == 0.05
+    assert limit.baseline("/state") == 0.5
+
+    limit.record(
+        started_at=time.monotonic(),
+        latency=1.5,
+        error=False,
+        saturated=True,
+        key="/state",
+    )
+    assert limit.value == 2
+
+
+async def test_local_queue_learns_limit(monkeypatch):
+    # growth depends on waiting requests only, not on wall-clock latency
+    monkeypatch.setattr(local_queue, "LATENCY_TOLERANCE", math.inf)
+    queue = LocalRequestQueue(limit=LocalConcurrencyLimit(max_limit=3))
+    active = 0
+    peak = 0
+
+    async def request():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+
+    for _ in range(3):
+        await asyncio.gather(
+            *(queue.run(request, priority=PRIORITY_POLL) for _ in range(6))
+        )
+
+    assert queue.max_concurrency == 3
+    assert peak == 3
+
+    async def failing():
+        raise asyncio.TimeoutError
+
+    with pytest.raises(asyncio.TimeoutError):
+        await queue.run(failing, priority=PRIORITY_WRITE)
+    assert queue.max_concurrency == 1
+
+
+async def test_local_queue_is_shared_per_host(hass):
+    queue = async_get_local_queue(hass, "192.0.2.10")
+
+    assert async_get_local_queue(hass, "192.0.2.10") is queue
+    assert async_get_local_queue(hass, "192.0.2.11") is not queue
@@ -0,0 +1,60 @@
+"""Tests for the cloud request rate limiter."""
+
+import asyncio
+
+from custom_components.myheat.ratelimit import MhRateLimiter
+
+
+async def test_rate_limiter_keeps_tokens_for_writes():
+    limiter = MhRateLimiter(rate=20, burst=3, write_reserve=1)
+
+    await limiter.acquire(write=False)
+    await limiter.acquire(write=False)
+    assert limiter.deferred_reads == 0
+
+    order = []
+
+    async def request(name, write):
+        await limiter.acquire(write=write)
+        order.append(name)
+
+    read = asyncio.create_task(request("read", False))
+    await asyncio.sleep(0)
+    await request("write", True)
+    await read
+
+    assert order == ["write", "read"]
+    assert limiter.deferred_reads == 1
+
+
+async def test_rate_limiter_waiting_writes_go_first():
+    limiter = MhRateLimiter(rate=20, burst=2, write_reserve=1)
+    await limiter.acquire(write=True)
+    await limiter.acquire(write=True)
+
+    order = []
+
+    async def request(name, write):
+        await limiter.acquire(write=write)
+        order.append(name)
+
+    await asyncio.gather(
+        request("read", False), request("write1", True), request("write2", True)
+    )
+
+    assert sorted(order[:2]) == ["write1", "write2"]
+    assert order[2] == "read"
+
+
+async def test_rate_limiter_meters_requests():
+    limiter = MhRateLimiter(rate=1, burst=10)
+    sent = []
+    limiter.add_listener(lambda: sent.append(limiter.requests_per_hour))
+
+    for write in (False, False, True):
+        await limiter.acquire(write=write)
+
+    assert sent == [1, 2, 3]
+    assert limiter.reads_per_hour == 2
+    assert limiter.writes_per_hour == 1
+    assert limiter.utilization == round(100 * 3 / 3600, 1)
@@ -0,0 +1,75 @@
+"""Tests for the poll phase scheduler."""
+
+from datetime import timedelta
+
+from custom_components.myheat.scheduler import MhPollScheduler, _spread
+
+INTERVAL = timedelta(seconds=10)
+
+
+def _next_ticks(scheduler, entry_id, start, count):
+    ticks = []
+    now = start
+    for _ in range(count):
+        now += scheduler.next_interval(entry_id, INTERVAL, now).total_seconds()
+        ticks.append(now)
+    return ticks
+
+
+def test_spread_keeps_phases_even():
+    assert [_spread(slot) for slot in range(4)] == [0, 0.5, 0.25, 0.75]
+    phases = sorted(_spread(slot) for slot in range(8))
+    assert phases == [slot / 8 for slot in range(8)]
+
+
+def test_scheduler_reuses_released_slots():
+    scheduler = MhPollScheduler(0.0)
+
+    assert [scheduler.add(entry) for entry in ("a", "b", "c")] == [0, 1, 2]
+    assert scheduler.add("b") == 1
+
+    scheduler.remove("b")
+    assert scheduler.add("d") == 1
+    assert scheduler.entries == 3
+
+
+def test_scheduler_spreads_entries_over_interval():
+    scheduler = MhPollScheduler(0.0, jitter=0)
+    for entry in ("a", "b", "c", "d"):
+        scheduler.add(entry)
+
+    # all entries start in lockstep, as after Home Assistant startup
+    phases = sorted(
+        _next_ticks(scheduler, entry, 3.0, 1)[0] % 10 for entry in ("a", "b", "c", "d")
+    )
+
+    assert phases == [0, 2.5, 5, 7.5]
+
+
+def test_scheduler_jitter_stays_bounded():
+    scheduler = MhPollScheduler(0.0, jitter=1.0)
+    scheduler.add("a")
+    scheduler.add("b")
+
+    ticks = _next_ticks(scheduler, "b", 0.0, 500)
+
+    for pos, tick in enumerate(ticks, start=1):
+        assert abs(tick - (pos * 10 - 5)) <= 1.0
+    gaps = [later - earlier for earlier, later in zip(ticks, ticks[1:])]
+    assert min(gaps) >= 8
+    assert len({round(gap, 3) for gap in gaps}) > 1
+
+
+def test_scheduler_staggers_first_refreshes():
+    scheduler = MhPollScheduler(
+        0.0, jitter=0.5, first_refresh_stagger=1.0, first_refresh_max_delay=2.5
+    )
+    for entry in ("a", "b", "c", "d"):
+        scheduler.add(entry)
+
+    delays = [scheduler.first_refresh_delay(entry) for entry in ("a", "b", "c", "d")]
+
+    assert delays[0] == 0
+    assert 1.0 <= delays[1] <= 1.5
+    assert 2.0 <= delays[2] <= 2.5
+    assert delays[3] == 2.5
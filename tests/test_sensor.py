@@ -1,11 +1,14 @@
 """Test MyHeat sensors."""
 
 from copy import deepcopy
+from datetime import timedelta
 from unittest.mock import patch
 
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.const import PERCENTAGE, UnitOfPressure, UnitOfTemperature
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
 
 from .const import MOCK_GET_DEVICE_INFO
 from .helpers import setup_mock_entry, state_by_name
@@ -15,7 +18,7 @@ async def test_sensor_entities(hass, bypass_get_device_info):
     """Test sensor entities are created from coordinator data."""
     await setup_mock_entry(hass)
 
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 12
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 15
 
     weather = state_by_name(hass, SENSOR_DOMAIN, "test_device weatherTemp")
     assert weather.state == "-6.78999999999996"
@@ -39,6 +42,17 @@ async def test_sensor_entities(hass, bypass_get_device_info):
     assert pressure.state == "2.223"
     assert pressure.attributes["unit_of_measurement"] == UnitOfPressure.BAR
 
+    circuit = state_by_name(hass, SENSOR_DOMAIN, "test_device cloud circuit")
+    assert circuit.state == "closed"
+    assert circuit.attributes["failures"] == 0
+
+    next_retry = state_by_name(hass, SENSOR_DOMAIN, "test_device cloud next retry")
+    assert next_retry.state == "unknown"
+
+    requests = state_by_name(hass, SENSOR_DOMAIN, "test_device cloud requests")
+    assert requests.state == "0"
+    assert requests.attributes["deferred_reads"] == 0
+
     modulation = state_by_name(
         hass, SENSOR_DOMAIN, "test_device Vaillant правый Modulation"
     )
@@ -46,6 +60,28 @@ async def test_sensor_entities(hass, bypass_get_device_info):
     assert modulation.attributes["unit_of_measurement"] == "%"
 
 
+async def test_cloud_requests_sensor_refreshes_once_a_minute(
+    hass, bypass_get_device_info
+):
+    """Test the request meter is not written on every cloud request."""
+    entry = await setup_mock_entry(hass)
+    limiter = entry.runtime_data.api.cloud.limiter
+
+    for _ in range(3):
+        await limiter.acquire(write=True)
+    await hass.async_block_till_done()
+
+    requests = state_by_name(hass, SENSOR_DOMAIN, "test_device cloud requests")
+    assert requests.state == "0"
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+    await hass.async_block_till_done()
+
+    requests = state_by_name(hass, SENSOR_DOMAIN, "test_device cloud requests")
+    assert requests.state == "3"
+    assert requests.attributes["writes"] == 3
+
+
 async def test_local_gsm_sensor_entities(hass):
     """Test local GSM diagnostic sensors."""
     data = deepcopy(MOCK_GET_DEVICE_INFO["data"])
@@ -60,7 +96,7 @@ async def test_local_gsm_sensor_entities(hass):
     ):
         await setup_mock_entry(hass)
 
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 14
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 17
 
     rssi = state_by_name(hass, SENSOR_DOMAIN, "test_device GSM RSSI")
     assert rssi.state == "74.0"
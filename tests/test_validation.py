@@ -0,0 +1,111 @@
+"""Tests for compiled response validation."""
+
+from copy import deepcopy
+import random
+import time
+
+import pytest
+import voluptuous as vol
+
+from custom_components.myheat.api import RPC_SCHEMA, RPC_VALIDATOR
+from custom_components.myheat.local_api import (
+    LOCAL_DEVICE_STATE_SCHEMA,
+    LOCAL_DEVICE_STATE_VALIDATOR,
+    LOCAL_OBJ_STATE_SCHEMA,
+    LOCAL_OBJ_STATE_VALIDATOR,
+)
+
+from .const import (
+    MOCK_GET_DEVICE_INFO,
+    MOCK_GET_DEVICES,
+    MOCK_LOCAL_GET_STATE,
+    MOCK_LOCAL_OBJ_STATE,
+    MOCK_NO_ERR,
+)
+
+CASES = [
+    (RPC_SCHEMA, RPC_VALIDATOR, MOCK_GET_DEVICE_INFO),
+    (RPC_SCHEMA, RPC_VALIDATOR, MOCK_GET_DEVICES),
+    (RPC_SCHEMA, RPC_VALIDATOR, MOCK_NO_ERR),
+    (LOCAL_OBJ_STATE_SCHEMA, LOCAL_OBJ_STATE_VALIDATOR, MOCK_LOCAL_OBJ_STATE),
+    (LOCAL_DEVICE_STATE_SCHEMA, LOCAL_DEVICE_STATE_VALIDATOR, MOCK_LOCAL_GET_STATE),
+]
+
+REPLACEMENTS = [None, True, 0, 1, -16777216, 2.5, "", "1", [], {}, [{}], {"i": 1}]
+
+
+def _paths(data, path=()):
+    yield path
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _paths(value, (*path, key))
+    elif isinstance(data, list):
+        for pos, value in enumerate(data):
+            yield from _paths(value, (*path, pos))
+
+
+def _mutate(data, rng):
+    data = deepcopy(data)
+    for _ in range(rng.randint(1, 3)):
+        path = rng.choice(list(_paths(data)))
+        if not path:
+            continue
+        parent = data
+        for key in path[:-1]:
+            parent = parent[key]
+        if isinstance(parent, dict) and rng.random() < 0.3:
+            del parent[path[-1]]
+        else:
+            parent[path[-1]] = deepcopy(rng.choice(REPLACEMENTS))
+    return data
+
+
+def _typed(data):
+    """Comparable form that also tells apart equal values of other types."""
+    if isinstance(data, dict):
+        return ("dict", [(key, _typed(value)) for key, value in data.items()])
+    if isinstance(data, list):
+        return ("list", [_typed(value) for value in data])
+    return (type(data).__name__, data)
+
+
+def _outcome(validate, data):
+    try:
+        return _typed(validate(data))
+    except vol.Invalid:
+        return "invalid"
+
+
+@pytest.mark.parametrize("schema,validator,sample", CASES)
+def test_compiled_validator_matches_schema(schema, validator, sample):
+    rng = random.Random(20261018)
+    for _ in range(500):
+        data = _mutate(sample, rng)
+        assert _outcome(validator, data) == _outcome(schema, data), data
+
+
+def test_compiled_validator_returns_valid_data_without_copying():
+    assert RPC_VALIDATOR(MOCK_GET_DEVICE_INFO) is MOCK_GET_DEVICE_INFO
+    assert LOCAL_OBJ_STATE_VALIDATOR(MOCK_LOCAL_OBJ_STATE) is MOCK_LOCAL_OBJ_STATE
+
+    missing_default = {**MOCK_LOCAL_OBJ_STATE}
+    del missing_default["scheds"]
+    assert LOCAL_OBJ_STATE_VALIDATOR(missing_default)["scheds"] == []
+
+    with pytest.raises(vol.Invalid):
+        LOCAL_OBJ_STATE_VALIDATOR({"heaters": []})
+
+
+@pytest.mark.perf
+def test_compiled_validator_benchmark():
+    obj_state = deepcopy(MOCK_LOCAL_OBJ_STATE)
+    obj_state["envs"] = obj_state["envs"] * 100
+    obj_state["engs"] = obj_state["engs"] * 100
+
+    def elapsed(validate):
+        started = time.perf_counter()
+        for _ in range(20):
+            validate(obj_state)
+        return time.perf_counter() - started
+
+    assert elapsed(LOCAL_OBJ_STATE_VALIDATOR) * 3 < elapsed(LOCAL_OBJ_STATE_SCHEMA)